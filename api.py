@@ -0,0 +1,286 @@
+"""
+Headless JSON API for the analysis results (no Streamlit session/reruns).
+
+Endpoints (all GET, JSON):
+    /health
+    /assets
+    /market?asset=BTC&start_year=2023&end_year=2026
+    /analysis?asset=BTC&start_year=2023&end_year=2026[&start=YYYY-MM-DD&end=YYYY-MM-DD&log_text=N]
+    /backtest?asset=BTC&start_year=2023&end_year=2026[&start_date=2024-01-01&horizon=4&ledger=1]
+
+`asset` accepts an ASSET_CONFIG name ("Bitcoin (BTC)"), its symbol ("BTC", "MBT", "ES") or price ticker.
+Without start/end, /analysis uses the app's default window (last 12 weeks).
+/analysis returns weekly_logs as columns (date, oi_delta, price_delta, pattern, market_mode codes,
+newest first); log_text=N adds the localized text for the newest N weeks.
+Responses carry ETag / Last-Modified tied to the latest CFTC report date and
+Cache-Control; repeated requests are served from an in-process response cache.
+
+Usage:
+    python api.py [--host 0.0.0.0] [--port 8000]
+"""
+import os
+import json
+import time
+import math
+import hashlib
+import argparse
+import datetime
+import threading
+from collections import OrderedDict
+from email.utils import format_datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+from src.config import ASSET_CONFIG, DEFAULT_START_YEAR, API_CACHE_TTL, API_CACHE_MAX_ENTRIES, API_MAX_AGE
+from src.data_loader import DataLoader
+from src.timeseries import select_range, default_analysis_range
+from src.analysis.market_analyzer import MarketAnalyzer
+from src.analysis.backtester import Backtester
+from src.analysis.positioning import Positioning
+
+
+# /backtest holding period limit (weeks)
+MAX_HORIZON_WEEKS = 52
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# -----------------------------------------------------------------------------
+# Payload builders
+# -----------------------------------------------------------------------------
+
+def resolve_asset(value):
+    if not value:
+        raise ApiError(400, "Missing 'asset' parameter.")
+    for name, conf in ASSET_CONFIG.items():
+        if value in (name, conf.get('symbol'), conf['ticker'], conf['ticker'].split("-")[0]):
+            return name, conf
+    raise ApiError(404, f"Unknown asset: {value}")
+
+
+def parse_int(params, key, default):
+    try:
+        return int(params.get(key, default))
+    except ValueError:
+        raise ApiError(400, f"Invalid '{key}'.")
+
+
+def parse_date(params, key):
+    if key not in params:
+        return None
+    try:
+        return datetime.date.fromisoformat(params[key])
+    except ValueError:
+        raise ApiError(400, f"Invalid '{key}' (expected YYYY-MM-DD).")
+
+
+def load_market(params):
+    """Loads the merged weekly bundle for the request's asset/years."""
+    name, conf = resolve_asset(params.get("asset"))
+    current_year = datetime.datetime.now().year
+    start_year = parse_int(params, "start_year", DEFAULT_START_YEAR)
+    end_year = parse_int(params, "end_year", current_year)
+    if start_year > end_year:
+        raise ApiError(400, "start_year is after end_year.")
+
+    combined_df = DataLoader.load_all_data(start_year, end_year, conf)
+    if combined_df.empty:
+        raise ApiError(502, f"No data for {name} ({start_year}~{end_year}).")
+    return name, combined_df
+
+
+def build_market(params):
+    name, combined_df = load_market(params)
+    start, end = parse_date(params, "start"), parse_date(params, "end")
+    rows = select_range(combined_df, start, end)
+    cols = ['Date', 'Close'] + [c for c in rows.columns if c.endswith('_All')] + Positioning.derived_columns(rows)
+    records = rows[cols].assign(Date=rows['Date'].dt.strftime('%Y-%m-%d')).to_dict(orient='records')
+    return combined_df, {"asset": name, "rows": records}
+
+
+def build_analysis(params):
+    name, combined_df = load_market(params)
+    start, end = parse_date(params, "start"), parse_date(params, "end")
+    if start is None and end is None:
+        start, end = default_analysis_range(combined_df)
+
+    result = MarketAnalyzer.analyze(combined_df, start=start, end=end)
+    if not result.get('is_valid'):
+        raise ApiError(422, result.get('error', 'Analysis failed.'))
+
+    payload = {
+        "asset": name,
+        "range": {"start": str(start) if start else None, "end": str(end) if end else None},
+        "metrics": result['metrics'],
+        "positioning": result['positioning'],
+        "trend": result['trend'],
+        "weekly_logs": result['weekly_logs'].to_columns(),
+        "verdict": result['verdict'],
+    }
+    # Localized log text only on request, for the newest N weeks
+    log_text = parse_int(params, "log_text", 0)
+    if log_text > 0:
+        payload["weekly_log_text"] = result['weekly_logs'].render(limit=log_text)
+    return combined_df, payload
+
+
+def build_backtest(params):
+    name, combined_df = load_market(params)
+    horizon = parse_int(params, "horizon", 4)
+    if not 1 <= horizon <= MAX_HORIZON_WEEKS:
+        raise ApiError(400, f"'horizon' must be between 1 and {MAX_HORIZON_WEEKS} weeks.")
+    start_date = params.get("start_date", combined_df.index[0].strftime('%Y-%m-%d'))
+
+    result = Backtester.run(combined_df, start_date=start_date, horizon=horizon)
+    payload = {"asset": name, "summary": result['summary']}
+    if params.get("ledger") in ("1", "true"):
+        payload["ledger"] = result['ledger'].to_dict(orient='records')
+    return combined_df, payload
+
+
+ROUTES = {
+    "/market": build_market,
+    "/analysis": build_analysis,
+    "/backtest": build_backtest,
+}
+
+
+def to_json(payload):
+    def default(o):
+        if hasattr(o, "item"):  # numpy scalars
+            return o.item()
+        if isinstance(o, (pd.Timestamp, datetime.date)):
+            return o.isoformat()
+        return str(o)
+
+    def clean(o):
+        # JSON has no NaN/Infinity
+        if isinstance(o, float) and not math.isfinite(o):
+            return None
+        if isinstance(o, dict):
+            return {k: clean(v) for k, v in o.items()}
+        if isinstance(o, list):
+            return [clean(v) for v in o]
+        return o
+
+    return json.dumps(clean(payload), ensure_ascii=False, default=default).encode("utf-8")
+
+
+# -----------------------------------------------------------------------------
+# Response cache
+# -----------------------------------------------------------------------------
+
+class ResponseCache:
+    """In-process LRU of serialized responses with TTL (thread-safe)."""
+
+    def __init__(self, ttl=API_CACHE_TTL, max_entries=API_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry["stored"] > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, body, report_date):
+        etag = '"{}"'.format(hashlib.sha256(key.encode("utf-8") + b"|" + report_date.encode("utf-8")).hexdigest()[:32])
+        entry = {"body": body, "etag": etag, "report_date": report_date, "stored": time.monotonic()}
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+
+response_cache = ResponseCache()
+
+
+# -----------------------------------------------------------------------------
+# HTTP
+# -----------------------------------------------------------------------------
+
+class ApiHandler(BaseHTTPRequestHandler):
+    server_version = "CFTCApi/1.0"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        try:
+            if url.path == "/health":
+                return self.send_json(200, b'{"status": "ok"}', cacheable=False)
+            if url.path == "/assets":
+                return self.send_json(200, to_json({"assets": ASSET_CONFIG}))
+
+            builder = ROUTES.get(url.path)
+            if builder is None:
+                raise ApiError(404, f"Unknown endpoint: {url.path}")
+
+            cache_key = url.path + "?" + "&".join(f"{k}={params[k]}" for k in sorted(params))
+            entry = response_cache.get(cache_key)
+            if entry is None:
+                combined_df, payload = builder(params)
+                report_date = combined_df.index[-1].strftime('%Y-%m-%d')
+                payload["report_date"] = report_date
+                entry = response_cache.set(cache_key, to_json(payload), report_date)
+
+            if self.headers.get("If-None-Match") == entry["etag"]:
+                return self.send_json(304, b"", entry=entry)
+            return self.send_json(200, entry["body"], entry=entry)
+
+        except ApiError as e:
+            self.send_json(e.status, to_json({"error": str(e)}), cacheable=False)
+        except Exception as e:
+            # Details go to the server log only, not to clients
+            print(f"API error on {self.path}: {type(e).__name__}: {e}")
+            self.send_json(500, to_json({"error": "Internal server error."}), cacheable=False)
+
+    def send_json(self, status, body, entry=None, cacheable=True):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        if cacheable:
+            self.send_header("Cache-Control", f"public, max-age={API_MAX_AGE}")
+        else:
+            self.send_header("Cache-Control", "no-store")
+        if entry is not None:
+            self.send_header("ETag", entry["etag"])
+            report_dt = datetime.datetime.strptime(entry["report_date"], "%Y-%m-%d").replace(tzinfo=datetime.timezone.utc)
+            self.send_header("Last-Modified", format_datetime(report_dt, usegmt=True))
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8000)))
+    args = parser.parse_args()
+
+    httpd = ThreadingHTTPServer((args.host, args.port), ApiHandler)
+    print(f"CFTC API listening on http://{args.host}:{args.port}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
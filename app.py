@@ -2,15 +2,205 @@
 import streamlit as st
 import pandas as pd
 import datetime
+import time
+import json
 from src.config import ASSET_CONFIG
 from src.data_loader import DataLoader
+from src.timeseries import default_analysis_range
 from src.analysis.market_analyzer import MarketAnalyzer
 from src.analysis.ai_narrator import AINarrator
+from src.analysis.panel import PanelAnalyzer
+from src.snapshot import SnapshotStore
 from src.ui import layout, charts, components
+from src import perf
+
+# -----------------------------------------------------------------------------
+# 0. Fragments (independently rerunnable sections)
+# -----------------------------------------------------------------------------
+# Widget interactions inside a fragment rerun only that fragment, not the whole page.
+# (Per-rerun server time is logged as "rerun.*" perf spans.)
+# - Time machine: slider move -> range analysis + band highlight only
+# - AI narrative: button click -> narrative only (chart is not redrawn)
+
+@st.fragment
+@perf.timed("rerun.time_machine")
+def render_time_machine(combined_df, price_df, asset_conf, settings, data_key):
+    # Date Range Selector (Time Machine)
+    st.write("---")
+    st.markdown("### 🕰 타임머신 구간 분석 (Historical Range Analysis)")
+    st.write("슬라이더의 양쪽 끝을 조절하여 **분석하고 싶은 구간(예: 상승장 초입)**을 지정하세요.")
+    
+    min_date = combined_df.index[0].date()
+    default_range = default_analysis_range(combined_df)
+    
+    # A range picked on the snapshot view carries over (see render_snapshot_view)
+    requested = st.session_state.get("requested_range", default_range)
+    if not (min_date <= requested[0] <= requested[1] <= default_range[1]):
+        requested = default_range
+    
+    analysis_range = st.slider(
+        "분석 구간 설정",
+        min_value=min_date,
+        max_value=default_range[1],
+        value=requested,
+        format="YYYY-MM-DD"
+    )
+    
+    sel_start, sel_end = analysis_range
+    
+    # Render Chart
+    # Base figure is built once per data/options and kept in session state;
+    # slider moves only re-sample the price trace and move the band.
+    fig_key = (data_key, settings["show_dollar"], settings["highlight"])
+    if st.session_state.get("base_fig_key") != fig_key:
+        st.session_state["base_fig"] = charts.plot_market_overview(
+            combined_df, 
+            price_df, 
+            asset_conf, 
+            show_dollar_value=settings["show_dollar"], 
+            highlight_change=settings["highlight"]
+        )
+        st.session_state["base_fig_key"] = fig_key
+    fig = charts.with_analysis_range(st.session_state["base_fig"], price_df, analysis_range)
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # --- 2. Analysis Section ---
+    
+    # Filter Data for Analysis
+    # Use 'combined_df' which has the weekly CFTC data aligned with price
+    # (sorted Date index -> binary-search slice, no per-row date objects / copy)
+    range_key = (data_key, sel_start, sel_end)
+    if st.session_state.get("analysis_key") != range_key:
+        st.session_state["analysis_result"] = MarketAnalyzer.analyze(combined_df, start=sel_start, end=sel_end)
+        st.session_state["analysis_key"] = range_key
+    analysis_result = st.session_state["analysis_result"]
+    
+    render_verdict(analysis_result, settings["api_key"], range_key)
+
+
+@st.fragment
+@perf.timed("rerun.snapshot_view")
+def render_snapshot_view(snapshot, settings):
+    # Default view served from the materialized snapshot: no CFTC/price load, no chart build.
+    # Moving the slider hands over to the full path (same slider, same range) via a page rerun.
+    st.write("---")
+    st.markdown("### 🕰 타임머신 구간 분석 (Historical Range Analysis)")
+    st.write("슬라이더의 양쪽 끝을 조절하여 **분석하고 싶은 구간(예: 상승장 초입)**을 지정하세요.")
+    
+    min_date = datetime.date.fromisoformat(snapshot["min_date"])
+    default_range = tuple(datetime.date.fromisoformat(d) for d in snapshot["default_range"])
+    
+    analysis_range = st.slider(
+        "분석 구간 설정",
+        min_value=min_date,
+        max_value=default_range[1],
+        value=default_range,
+        format="YYYY-MM-DD"
+    )
+    if analysis_range != default_range:
+        st.session_state["requested_range"] = analysis_range
+        st.session_state["snapshot_bypass"] = snapshot["asset"]
+        st.rerun()
+    
+    st.plotly_chart(json.loads(snapshot["chart_json"]), use_container_width=True)
+    
+    analysis_result = SnapshotStore.analysis_result(snapshot)
+    range_key = (("snapshot", snapshot["asset"], snapshot["report_date"]),) + default_range
+    render_verdict(analysis_result, settings["api_key"], range_key)
+
+
+def render_verdict(analysis_result, api_key, range_key):
+    if not analysis_result.get('is_valid'):
+        st.warning(f"분석 불가: {analysis_result.get('error')}")
+    else:
+         # UI Rendering
+         verdict = analysis_result['verdict']
+         final_color = verdict['color']
+         
+         st.markdown(f"### 📢 AI 종합 분석: :{final_color}[{verdict['title']}]")
+         
+         # Color-coded Forecast
+         msg_func = st.info
+         if final_color == 'green': msg_func = st.success
+         elif final_color == 'red': msg_func = st.error
+         elif final_color in ['blue', 'orange']: msg_func = st.warning
+         
+         msg_func(f"**🔮 향후 전망 (Forecast):** {verdict['forecast']}")
+         
+         # --- 3. AI Narrative Section ---
+         render_ai_narrative(analysis_result['analysis_df'], api_key, range_key)
+
+
+@st.fragment
+@perf.timed("rerun.ai_narrative")
+def render_ai_narrative(analysis_df, api_key, range_key):
+    narratives = st.session_state.setdefault("narratives", {})
+
+    if st.button("🕵️‍♂️ [헤지펀드의 비밀 고백] 듣기 (AI Narrative)"):
+        if AINarrator.backend.requires_api_key and not api_key:
+            st.warning("🔐 사이드바 'AI 실험실'에 **Gemini API Key**를 입력해야 들을 수 있습니다.")
+        else:
+            with st.spinner("🕶️ 헤지펀드 수석 전략가가 비밀 장부를 확인하고 있습니다..."):
+                # Streams: header and each phase card render as soon as they are complete
+                ai_result = components.render_ai_narrative_stream(
+                    AINarrator.stream_narrative(analysis_df, api_key)
+                )
+            # Keep only the current range's narrative
+            narratives.clear()
+            narratives[range_key] = ai_result
+    elif range_key in narratives:
+        components.render_ai_narrative(narratives[range_key])
+
+
+PANEL_MODE_LABELS = {
+    "shorts": "헤지펀드 숏 vs 숏 (Shorts x Shorts)",
+    "prices": "가격 vs 가격 (Prices x Prices)",
+    "shorts_vs_prices": "헤지펀드 숏 vs 가격 (Shorts x Prices)",
+}
+
+
+@st.fragment
+@perf.timed("rerun.cross_asset")
+def render_cross_asset_view(panel):
+    # Mode / window date / lag widgets only re-slice the cached matrices
+    markets = panel["markets"]
+    mode = st.radio("비교 대상", list(PANEL_MODE_LABELS), format_func=PANEL_MODE_LABELS.get, horizontal=True)
+    matrices = panel["modes"][mode]
+    symmetric = mode != "shorts_vs_prices"
+    row_suffix, col_suffix = {"shorts": (" 숏", " 숏"), "prices": (" 가격", " 가격"), "shorts_vs_prices": (" 숏", " 가격")}[mode]
+    row_labels = [m + row_suffix for m in markets]
+    col_labels = [m + col_suffix for m in markets]
+    
+    # 1. Rolling correlation at a chosen window end
+    st.markdown(f"### 🔗 롤링 상관계수 (최근 {panel['window']}주, 주간 변화율 기준)")
+    dates = [d.date() for d in panel["dates"]]
+    as_of = st.select_slider("기준 주 (윈도우 끝)", options=dates, value=dates[-1])
+    t = dates.index(as_of)
+    st.plotly_chart(
+        charts.plot_correlation_heatmap(matrices["rolling"][t], row_labels, col_labels, f"Rolling correlation ({as_of})"),
+        use_container_width=True
+    )
+    st.plotly_chart(
+        charts.plot_average_correlation(dates, PanelAnalyzer.average_pairwise(matrices["rolling"], symmetric), panel["window"]),
+        use_container_width=True
+    )
+    
+    # 2. Lead / lag
+    st.markdown("### ⏩ 선행/후행 상관 (Lead / Lag)")
+    st.caption("시차 +k: 행(row) 마켓의 변화가 k주 뒤 열(column) 마켓의 변화와 얼마나 같이 움직이는지 (행이 선행). 선택 기간 전체 기준.")
+    max_lag = panel["max_lag"]
+    lag = st.slider("시차 (주)", min_value=-max_lag, max_value=max_lag, value=1)
+    st.plotly_chart(
+        charts.plot_correlation_heatmap(matrices["lead_lag"][lag + max_lag], row_labels, col_labels, f"Lead/lag correlation (k = {lag:+d}w)"),
+        use_container_width=True
+    )
+
 
 # -----------------------------------------------------------------------------
 # 1. Page & Sidebar
 # -----------------------------------------------------------------------------
+page_t0 = time.perf_counter()
+perf.start_run()
 layout.render_page_config()
 settings = layout.render_sidebar()
 
@@ -25,16 +215,28 @@ if settings["page"] == "📊 차트 분석 (Analysis)":
     asset_name = settings["asset_name"]
     asset_conf = ASSET_CONFIG[asset_name]
     
+    # Default view -> serve the latest-week snapshot if it is still current
+    snapshot = None
+    if SnapshotStore.is_default_view(settings) and st.session_state.get("snapshot_bypass") != asset_name:
+        with perf.span("SnapshotStore.load"):
+            snapshot = SnapshotStore.load_fresh(asset_name)
+    
     if start_year > end_year:
         st.error("시작 연도가 종료 연도보다 큽니다.")
+    elif snapshot is not None:
+        layout.render_data_status(
+            snapshot["report_date"],
+            loaded_at=datetime.datetime.fromisoformat(snapshot["created_at"]).astimezone().replace(tzinfo=None),
+        )
+        render_snapshot_view(snapshot, settings)
     else:
         with st.spinner(f"{asset_name} 데이터를 가져오는 중입니다..."):
-            combined_df = DataLoader.load_all_data(start_year, end_year, asset_conf)
-            # Need strict daily price_df for chart? load_all_data returns merged.
-            # charts.py expects (combined_df, price_df).
-            # We can re-fetch price or modify load_all_data.
-            # DataLoader has get_price_data.
-            price_df = DataLoader.get_price_data(asset_conf['ticker'], start_year, end_year)
+            # charts.py expects (combined_df, price_df): both come from the same cached load
+            with perf.span("DataLoader.load_bundle", cache="hit"):
+                combined_df, price_df = DataLoader.load_bundle(start_year, end_year, asset_conf)
+            data_status = DataLoader.bundle_status(start_year, end_year, asset_conf)
+        if data_status is not None:
+            layout.render_data_status(**data_status)
 
         if combined_df.empty:
              st.error(f"CFTC 데이터를 찾을 수 없습니다. ({start_year}~{end_year})")
@@ -42,84 +244,45 @@ if settings["page"] == "📊 차트 분석 (Analysis)":
              st.error("가격 데이터를 가져올 수 없습니다.")
         else:
             # --- 1. Chart Section ---
+            # Identifies the loaded data for the fragments' session-state caches
+            data_key = (asset_name, start_year, end_year, combined_df.index[-1], len(combined_df), len(price_df))
+            render_time_machine(combined_df, price_df, asset_conf, settings, data_key)
             
-            # Date Range Selector (Time Machine)
-            st.write("---")
-            st.markdown("### 🕰 타임머신 구간 분석 (Historical Range Analysis)")
-            st.write("슬라이더의 양쪽 끝을 조절하여 **분석하고 싶은 구간(예: 상승장 초입)**을 지정하세요.")
-            
-            min_date = combined_df['Date'].min().date()
-            max_date = combined_df['Date'].max().date()
-            default_start = max_date - datetime.timedelta(weeks=12)
-            
-            analysis_range = st.slider(
-                "분석 구간 설정",
-                min_value=min_date,
-                max_value=max_date,
-                value=(default_start, max_date),
-                format="YYYY-MM-DD"
-            )
-            
-            sel_start, sel_end = analysis_range
-            
-            # Render Chart
-            fig = charts.plot_market_overview(
-                combined_df, 
-                price_df, 
-                asset_conf, 
-                show_dollar_value=settings["show_dollar"], 
-                highlight_change=settings["highlight"],
-                analysis_range=analysis_range
-            )
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # --- 2. Analysis Section ---
-            
-            # Filter Data for Analysis
-            # Use 'combined_df' which has the weekly CFTC data aligned with price
-            range_df = combined_df[
-                (combined_df['Date'].dt.date >= sel_start) & 
-                (combined_df['Date'].dt.date <= sel_end)
-            ].copy()
-            
-            analysis_result = MarketAnalyzer.analyze(range_df)
-            
-            if not analysis_result.get('is_valid'):
-                st.warning(f"분석 불가: {analysis_result.get('error')}")
-            else:
-                 # UI Rendering
-                 verdict = analysis_result['verdict']
-                 final_color = verdict['color']
-                 
-                 st.markdown(f"### 📢 AI 종합 분석: :{final_color}[{verdict['title']}]")
-                 
-                 # Color-coded Forecast
-                 msg_func = st.info
-                 if final_color == 'green': msg_func = st.success
-                 elif final_color == 'red': msg_func = st.error
-                 elif final_color in ['blue', 'orange']: msg_func = st.warning
-                 
-                 msg_func(f"**🔮 향후 전망 (Forecast):** {verdict['forecast']}")
-                 
-                 # --- 3. AI Narrative Section ---
-                 if st.button("🕵️‍♂️ [헤지펀드의 비밀 고백] 듣기 (AI Narrative)"):
-                     api_key = settings["api_key"]
-                     if not api_key:
-                         st.warning("🔐 사이드바 'AI 실험실'에 **Gemini API Key**를 입력해야 들을 수 있습니다.")
-                     else:
-                         with st.spinner("🕶️ 헤지펀드 수석 전략가가 비밀 장부를 확인하고 있습니다..."):
-                             ai_result = AINarrator.generate_narrative(analysis_result['analysis_df'], api_key)
-                             
-                             if "error" in ai_result:
-                                 st.error(f"AI Error: {ai_result['error']}")
-                             else:
-                                 # Render Cards
-                                 st.success(f"**전략 요약**: {ai_result.get('header', '')}")
-                                 components.render_ai_cards(ai_result.get('phases', []))
-                                 
-                                 st.markdown("---")
-                                 st.markdown(f"**🔮 미래 계획**: {ai_result.get('future')}")
-                                 st.markdown(f"**💡 조언**: {ai_result.get('advice')}")
+            # By-product: (re)materialize the default-view snapshot once a new report is due
+            if SnapshotStore.is_default_view(settings) and not SnapshotStore.is_fresh(SnapshotStore.load(asset_name)):
+                SnapshotStore.build(asset_name, combined_df, price_df, asset_conf)
+
+elif settings["page"] == "🧭 크로스 마켓 (Cross-Asset)":
+    start_year = settings["start_year"]
+    end_year = settings["end_year"]
+    panel_assets = settings["panel_assets"]
+    
+    st.markdown("## 🧭 크로스 마켓 포지션 상관 (Cross-Asset Panel)")
+    st.write("선택한 마켓들의 **헤지펀드(Leveraged Funds) 숏 포지션**과 **가격**의 주간 변화율이 서로 얼마나 같이 움직이는지 보여줍니다.")
+    
+    if start_year > end_year:
+        st.error("시작 연도가 종료 연도보다 큽니다.")
+    elif len(panel_assets) < 2:
+        st.info("비교할 마켓을 2개 이상 선택하세요.")
+    else:
+        with st.spinner("마켓 데이터를 불러와 상관 행렬을 계산하는 중입니다..."):
+            # Cached per data version: a new weekly report -> recomputed once
+            data_version = DataLoader.latest_report_date(end_year)
+            if data_version:
+                layout.render_data_status(data_version)
+            with perf.span("PanelAnalyzer.compute", cache="hit"):
+                panel = PanelAnalyzer.compute(
+                    start_year, end_year, tuple(panel_assets),
+                    settings["panel_window"], settings["panel_max_lag"], data_version
+                )
+        
+        if not panel["modes"]:
+            st.warning(f"공통 데이터가 부족합니다. (공통 주간 데이터가 롤링 윈도우 {settings['panel_window']}주 이상 필요)")
+        else:
+            dropped = [a for a in panel_assets if a not in panel["markets"]]
+            if dropped:
+                st.caption(f"데이터가 없어 제외된 마켓: {', '.join(dropped)}")
+            render_cross_asset_view(panel)
 
 elif settings["page"] == "🎓 초보자 가이드 (Guide)":
     st.markdown("""
@@ -257,3 +420,7 @@ elif settings["page"] == "🎓 초보자 가이드 (Guide)":
     
     **Created by Antigravity**
     """)
+
+perf.record("rerun.page", (time.perf_counter() - page_t0) * 1000)
+if settings.get("show_perf"):
+    layout.render_perf_panel(perf.last_run())
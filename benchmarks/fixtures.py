@@ -0,0 +1,153 @@
+"""
+Synthetic CFTC TFF / price fixtures for offline benchmarks.
+
+- write_tff_zip(): yearly "fut_fin_txt_{year}.zip" files in the CFTC text layout
+  (configurable number of markets x weeks), readable by DataLoader unchanged.
+- synthetic_price_fetcher(): drop-in for DataLoader.price_fetcher (daily OHLCV).
+- FixtureServer: local stand-in HTTP server for the zip files, so DataLoader runs
+  end to end offline via the CFTC_URL_TEMPLATE env var.
+"""
+import os
+import io
+import zipfile
+import threading
+import functools
+import zlib
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+import numpy as np
+import pandas as pd
+
+# Real market names (the app filters on substrings of these)
+CORE_MARKETS = [
+    "BITCOIN - CHICAGO MERCANTILE EXCHANGE",
+    "MICRO BITCOIN - CHICAGO MERCANTILE EXCHANGE",
+    "ETHER CASH SETTLED - CHICAGO MERCANTILE EXCHANGE",
+    "MICRO ETHER - CHICAGO MERCANTILE EXCHANGE",
+    "E-MINI S&P 500 - CHICAGO MERCANTILE EXCHANGE",
+    "NASDAQ MINI - CHICAGO MERCANTILE EXCHANGE",
+]
+
+TRADER_GROUPS = ["Dealer", "Asset_Mgr", "Lev_Money", "Other_Rept"]
+
+# Per-trader-group count columns follow the TFF text layout (long/short/spread, changes, % of OI, traders)
+POSITION_COLS = (
+    ["Open_Interest_All"]
+    + [f"{g}_Positions_{side}_All" for g in TRADER_GROUPS for side in ("Long", "Short", "Spread")]
+    + ["Tot_Rept_Positions_Long_All", "Tot_Rept_Positions_Short_All",
+       "NonRept_Positions_Long_All", "NonRept_Positions_Short_All"]
+)
+FILLER_COLS = (
+    [f"Change_in_{c}" for c in POSITION_COLS]
+    + [f"Pct_of_OI_{c}" for c in POSITION_COLS]
+    + [f"Traders_{g}_{side}_All" for g in TRADER_GROUPS for side in ("Long", "Short", "Spread")]
+)
+
+# Rough contract-level scale per market (so values look plausible)
+MARKET_SCALE = {"BITCOIN": 15000, "ETHER": 8000, "S&P": 900000, "NASDAQ": 250000}
+
+
+def _seed(*parts):
+    return zlib.crc32("|".join(str(p) for p in parts).encode("utf-8"))
+
+
+def market_names(n_markets):
+    """The core markets plus synthetic filler markets up to n_markets."""
+    names = CORE_MARKETS[:n_markets]
+    names += [f"SYNTHETIC INDEX {i:03d} - CHICAGO MERCANTILE EXCHANGE" for i in range(n_markets - len(names))]
+    return names
+
+
+def make_tff_year_frame(year, n_markets=len(CORE_MARKETS), weeks=52):
+    """One year of weekly TFF rows (report dates = Tuesdays), newest first like the real file."""
+    # Current year: only reports published so far
+    last_day = min(pd.Timestamp(f"{year}-12-31"), pd.Timestamp.today().normalize())
+    dates = pd.date_range(f"{year}-01-01", last_day, freq="W-TUE")[:weeks]
+    frames = []
+    for market in market_names(n_markets):
+        rng = np.random.default_rng(_seed(market, year))
+        scale = next((v for k, v in MARKET_SCALE.items() if k in market), 20000)
+        if market.startswith("MICRO"):
+            scale //= 5
+        n = len(dates)
+        data = {
+            "Market_and_Exchange_Names": market,
+            "As_of_Date_In_Form_YYMMDD": dates.strftime("%y%m%d"),
+            "Report_Date_as_YYYY-MM-DD": dates.strftime("%Y-%m-%d"),
+            "CFTC_Contract_Market_Code": f"{_seed(market) % 999999:06d}",
+        }
+        for col in POSITION_COLS:
+            walk = np.exp(np.cumsum(rng.normal(0, 0.06, n)))
+            data[col] = np.round(scale * walk * rng.uniform(0.2, 1.0)).astype(np.int64)
+        for col in FILLER_COLS:
+            data[col] = np.round(rng.normal(0, scale / 50, n), 1)
+        data["Contract_Units"] = "(CONTRACTS)"
+        frames.append(pd.DataFrame(data))
+
+    df = pd.concat(frames, ignore_index=True)
+    return df.sort_values("Report_Date_as_YYYY-MM-DD", ascending=False, kind="stable")
+
+
+def write_tff_zip(year, out_dir, n_markets=len(CORE_MARKETS), weeks=52):
+    """Writes fut_fin_txt_{year}.zip (containing FinFut{yy}.txt) into out_dir; returns the path."""
+    os.makedirs(out_dir, exist_ok=True)
+    df = make_tff_year_frame(year, n_markets, weeks)
+    buf = io.StringIO()
+    df.to_csv(buf, index=False)
+    path = os.path.join(out_dir, f"fut_fin_txt_{year}.zip")
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as z:
+        z.writestr(f"FinFut{year % 100:02d}.txt", buf.getvalue())
+    return path
+
+
+def make_price_frame(ticker, start_date, end_date):
+    """Daily OHLCV random walk for a ticker (deterministic per ticker), DatetimeIndex like yfinance."""
+    index = pd.date_range("2015-01-01", end_date, freq="D")
+    rng = np.random.default_rng(_seed(ticker))
+    start_price = 60000.0 if "BTC" in ticker else 3000.0
+    close = start_price * np.exp(np.cumsum(rng.normal(0, 0.03, len(index))))
+    df = pd.DataFrame({
+        "Open": close * (1 + rng.normal(0, 0.005, len(index))),
+        "High": close * (1 + np.abs(rng.normal(0, 0.01, len(index)))),
+        "Low": close * (1 - np.abs(rng.normal(0, 0.01, len(index)))),
+        "Close": close,
+        "Volume": rng.integers(10**8, 10**10, len(index)),
+    }, index=index)
+    return df.loc[start_date:end_date]
+
+
+def synthetic_price_fetcher(ticker, start_date, end_date):
+    """Signature-compatible with DataLoader.price_fetcher."""
+    return make_price_frame(ticker, start_date, end_date)
+
+
+class FixtureServer:
+    """
+    Serves a directory over HTTP on localhost (background thread).
+        with FixtureServer(zip_dir) as server:
+            os.environ["CFTC_URL_TEMPLATE"] = server.url_template
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        handler = functools.partial(_QuietHandler, directory=directory)
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url_template(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}/fut_fin_txt_{{year}}.zip"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
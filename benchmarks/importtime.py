@@ -0,0 +1,101 @@
+"""
+Import-time benchmark for the app's module graph.
+
+Runs `python -X importtime` in a fresh interpreter for the modules app.py imports,
+aggregates the cumulative time per top-level package and writes a summary
+(benchmarks/results/importtime.txt by default).
+
+Usage:
+    python benchmarks/importtime.py [--runs 5] [--out PATH]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Same imports as app.py (app.py itself calls Streamlit APIs at import time)
+APP_IMPORTS = [
+    "src.config",
+    "src.data_loader",
+    "src.analysis.market_analyzer",
+    "src.analysis.ai_narrator",
+    "src.ui.layout",
+    "src.ui.charts",
+    "src.ui.components",
+]
+
+# Heavy third-party packages we track individually
+TRACKED = ["streamlit", "pandas", "plotly", "yfinance", "requests", "google.generativeai", "matplotlib"]
+
+
+def run_once():
+    code = "; ".join(f"import {m}" for m in APP_IMPORTS)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    # Lines: "import time: self [us] | cumulative | <indent>package", children before parents.
+    # Walk them in reverse (parents first) so each package's time counts only its
+    # outermost imports, not the nested submodules again.
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, raw_name = line[len("import time:"):].split("|")
+        depth = (len(raw_name) - len(raw_name.lstrip()) - 1) // 2
+        entries.append((depth, int(cumulative), raw_name.strip()))
+
+    per_package = defaultdict(int)
+    total = 0
+    ancestors = []
+    for depth, cumulative, name in reversed(entries):
+        del ancestors[depth:]
+        package = "google.generativeai" if name.startswith("google.generativeai") else name.split(".")[0]
+        if depth == 0:
+            total += cumulative
+        if package in TRACKED and package not in ancestors:
+            per_package[package] += cumulative
+        ancestors.append(package)
+    return total, per_package
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--out", default=os.path.join(ROOT, "benchmarks", "results", "importtime.txt"))
+    args = parser.parse_args()
+
+    totals = []
+    packages = defaultdict(list)
+    for _ in range(args.runs):
+        total, per_package = run_once()
+        totals.append(total)
+        for name, us in per_package.items():
+            packages[name].append(us)
+
+    lines = [
+        f"# python -X importtime summary for app imports ({args.runs} runs, median, ms)",
+        f"# python {sys.version.split()[0]}",
+        f"total_import_ms: {statistics.median(totals) / 1000:.1f}",
+    ]
+    for name in sorted(packages, key=lambda n: -statistics.median(packages[n])):
+        lines.append(f"{name}: {statistics.median(packages[name]) / 1000:.1f}")
+    not_loaded = [name for name in TRACKED if name not in packages]
+    lines.append(f"not_imported_at_start: {', '.join(not_loaded)}")
+
+    report = "\n".join(lines) + "\n"
+    print(report, end="")
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, "w") as f:
+        f.write(report)
+
+
+if __name__ == "__main__":
+    main()
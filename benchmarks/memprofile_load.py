@@ -0,0 +1,69 @@
+"""
+Memory profile of the data load path (tracemalloc).
+
+Runs DataLoader.load_all_data with the memory profiling mode enabled and prints
+peak / retained memory per stage (download, unzip+parse, cache write/read, year index,
+filter, concat, price.align keyed lookup, positioning, export) and per year. The same
+report is printed by the app when it runs with CFTC_MEMPROFILE=1.
+
+Usage:
+    python benchmarks/memprofile_load.py [--start-year 2018] [--end-year 2025] [--asset "Bitcoin (BTC)"]
+        [--offline [--markets 100]] [--cold]
+"""
+import os
+import sys
+import shutil
+import argparse
+import datetime
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start-year", type=int, default=2018)
+    parser.add_argument("--end-year", type=int, default=datetime.datetime.now().year)
+    parser.add_argument("--asset", default="Bitcoin (BTC)")
+    parser.add_argument("--offline", action="store_true", help="synthetic fixtures + local HTTP server")
+    parser.add_argument("--markets", type=int, default=100, help="markets per synthetic yearly file (--offline)")
+    parser.add_argument("--cold", action="store_true", help="start from an empty disk cache")
+    args = parser.parse_args()
+
+    os.environ["CFTC_MEMPROFILE"] = "1"
+    os.environ.setdefault("CFTC_PERF_LOG", "0")
+
+    server = None
+    work_dir = None
+    if args.offline:
+        import fixtures
+        work_dir = tempfile.mkdtemp(prefix="cftc_memprofile_")
+        for year in range(args.start_year, args.end_year + 1):
+            fixtures.write_tff_zip(year, os.path.join(work_dir, "www"), n_markets=args.markets)
+        server = fixtures.FixtureServer(os.path.join(work_dir, "www")).__enter__()
+        os.environ["CFTC_URL_TEMPLATE"] = server.url_template
+        os.environ["CFTC_CACHE_DIR"] = os.path.join(work_dir, "cache")
+
+    try:
+        from src.config import ASSET_CONFIG, CACHE_DIR
+        from src.data_loader import DataLoader
+
+        if args.offline:
+            import fixtures
+            DataLoader.price_fetcher = fixtures.synthetic_price_fetcher
+        if args.cold and not args.offline:
+            shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+        # The report is printed when the outermost stage (load_all_data) finishes
+        DataLoader.load_all_data(args.start_year, args.end_year, ASSET_CONFIG[args.asset])
+    finally:
+        if server:
+            server.__exit__(None, None, None)
+        if work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Offline load test of the AI narrative path using the replay backend.
+
+Fires N concurrent AINarrator.stream_narrative calls (distinct data per call, empty
+narrative cache) and reports time-to-first-event and total latency percentiles.
+
+Usage:
+    python benchmarks/narrative_load.py [--requests 32] [--latency 0.5] [--concurrency 4]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+from src.analysis.ai_narrator import AINarrator
+from src.analysis.narrative_cache import NarrativeCache
+from src.analysis.narrator_backends import ReplayBackend, ResilientBackend
+
+
+def make_weekly_df(seed, weeks=12):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Date": pd.date_range("2025-01-03", periods=weeks, freq="W-FRI"),
+        "Close": np.exp(np.cumsum(rng.normal(0, 0.05, weeks))) * 60000,
+        "Lev_Money_Positions_Short_All": np.exp(np.cumsum(rng.normal(0, 0.06, weeks))) * 12000,
+    })
+
+
+def one_request(seed):
+    t0 = time.perf_counter()
+    first = None
+    status = "error"
+    for event, _ in AINarrator.stream_narrative(make_weekly_df(seed), api_key=None):
+        if first is None:
+            first = time.perf_counter() - t0
+        if event in ("done", "error"):
+            status = event
+    return status, first, time.perf_counter() - t0
+
+
+def pct(values, q):
+    return float(np.percentile(values, q)) * 1000 if values else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--chunk-delay", type=float, default=0.02)
+    parser.add_argument("--concurrency", type=int, default=4, help="backend concurrency limit")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    AINarrator.cache = NarrativeCache(cache_dir=tempfile.mkdtemp(prefix="narrative_load_"))
+    AINarrator.backend = ResilientBackend(
+        ReplayBackend(latency=args.latency, chunk_delay=args.chunk_delay),
+        timeout=args.timeout, max_concurrency=args.concurrency
+    )
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.requests) as pool:
+        results = list(pool.map(one_request, range(args.requests)))
+    wall = time.perf_counter() - t0
+
+    ok = [r for r in results if r[0] == "done"]
+    firsts = [r[1] for r in ok]
+    totals = [r[2] for r in ok]
+    print(f"requests={args.requests} ok={len(ok)} errors={len(results) - len(ok)} wall={wall:.2f}s")
+    print(f"first_event_ms p50={pct(firsts, 50):.0f} p95={pct(firsts, 95):.0f}")
+    print(f"total_ms       p50={pct(totals, 50):.0f} p95={pct(totals, 95):.0f} mean={statistics.mean(totals) * 1000 if totals else float('nan'):.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Offline benchmark suite for the data/analysis pipeline.
+
+Generates synthetic TFF zips (markets x weeks x years) and daily prices, serves the
+zips from a local HTTP server and runs DataLoader end to end against them, then times
+load / parse / filter / merge / analyze / backtest / chart building.
+
+Results are written to benchmarks/results/<label>.json; pass --compare to diff against
+a previous run (exit code 1 if any stage is slower than --threshold x baseline).
+
+Usage:
+    python benchmarks/run_benchmarks.py [--start-year 2018] [--end-year 2025]
+        [--markets 100] [--weeks 52] [--repeat 5] [--label local] [--compare benchmarks/results/baseline.json]
+"""
+import os
+import sys
+import json
+import time
+import glob
+import shutil
+import argparse
+import datetime
+import platform
+import statistics
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fixtures
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start-year", type=int, default=2018)
+    parser.add_argument("--end-year", type=int, default=datetime.datetime.now().year - 1)
+    parser.add_argument("--markets", type=int, default=100, help="markets per yearly file")
+    parser.add_argument("--weeks", type=int, default=52, help="report weeks per year")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--label", default="local")
+    parser.add_argument("--compare", help="baseline results JSON")
+    parser.add_argument("--threshold", type=float, default=1.25, help="regression ratio vs baseline")
+    return parser.parse_args()
+
+
+def measure(func, repeat, setup=None):
+    """Runs func `repeat` times (setup before each, untimed); returns (timings_ms, last_result)."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - t0) * 1000)
+    return timings, result
+
+
+def summarize(timings):
+    return {
+        "median_ms": round(statistics.median(timings), 2),
+        "min_ms": round(min(timings), 2),
+        "runs": len(timings),
+    }
+
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+
+    regressions = []
+    print(f"\n{'stage':<28} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for name, cur in results.items():
+        base = baseline.get(name)
+        if not base:
+            print(f"{name:<28} {'-':>10} {cur['median_ms']:>10.1f} {'new':>7}")
+            continue
+        ratio = cur["median_ms"] / base["median_ms"] if base["median_ms"] else float("inf")
+        flag = "  <-- REGRESSION" if ratio > threshold else ""
+        print(f"{name:<28} {base['median_ms']:>10.1f} {cur['median_ms']:>10.1f} {ratio:>7.2f}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    args = parse_args()
+    work_dir = tempfile.mkdtemp(prefix="cftc_bench_")
+    www_dir = os.path.join(work_dir, "www")
+    cache_dir = os.path.join(work_dir, "cache")
+
+    print(f"Generating fixtures: {args.start_year}-{args.end_year}, {args.markets} markets x {args.weeks} weeks ...")
+    for year in range(args.start_year, args.end_year + 1):
+        fixtures.write_tff_zip(year, www_dir, n_markets=args.markets, weeks=args.weeks)
+
+    server = fixtures.FixtureServer(www_dir).__enter__()
+    try:
+        # Must be set before importing src.* (config reads the env at import time)
+        os.environ["CFTC_URL_TEMPLATE"] = server.url_template
+        os.environ["CFTC_CACHE_DIR"] = cache_dir
+        os.environ.setdefault("CFTC_PERF_LOG", "0")
+
+        import pandas as pd
+        from src.config import ASSET_CONFIG
+        from src.data_loader import DataLoader
+        from src.price_store import PriceStore, align_weekly
+        from src.timeseries import default_analysis_range
+        from src.analysis.market_analyzer import MarketAnalyzer
+        from src.analysis.backtester import Backtester
+        from src.ui import charts
+
+        DataLoader.price_fetcher = fixtures.synthetic_price_fetcher
+        asset_conf = ASSET_CONFIG["Bitcoin (BTC)"]
+        start, end = args.start_year, args.end_year
+        results = {}
+
+        def drop_disk_cache():
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            drop_memory_cache()
+
+        def drop_memory_cache():
+            DataLoader.clear_year_cache()
+            PriceStore.clear_memory()
+            DataLoader.clear_bundle_cache()
+
+        def run(name, func, setup=None):
+            timings, value = measure(func, args.repeat, setup)
+            results[name] = summarize(timings)
+            print(f"  {name:<28} {results[name]['median_ms']:>10.1f} ms")
+            return value
+
+        print("Running benchmarks ...")
+        run("load_all_data.cold", lambda: DataLoader.load_all_data(start, end, asset_conf), setup=drop_disk_cache)
+        run("load_all_data.disk_cache", lambda: DataLoader.load_all_data(start, end, asset_conf),
+            setup=drop_memory_cache)
+        combined = run("load_all_data.memory_cache", lambda: DataLoader.load_all_data(start, end, asset_conf))
+
+        # Every catalog asset from the shared year frames (downloads/parses don't scale with assets)
+        all_assets = list(DataLoader.read_cftc_year(end)[1])
+        run("cftc.all_assets_disk_cache", lambda: [DataLoader.get_cftc_data(start, end, key) for key in all_assets],
+            setup=DataLoader.clear_year_cache)
+
+        run("cftc.download_year", lambda: DataLoader.download_and_read_cftc_year(end, asset_conf['cftc_name']),
+            setup=drop_disk_cache)
+        # Past years are served from the disk cache from here on
+        DataLoader.download_and_read_cftc_year(start, asset_conf['cftc_name'])
+        cache_file = glob.glob(os.path.join(cache_dir, f"*{start}*.txt"))[0]
+        run("cftc.parse_year", lambda: pd.read_csv(cache_file, low_memory=False))
+        run("cftc.filter_year", lambda: DataLoader.download_and_read_cftc_year(start, asset_conf['cftc_name']))
+
+        cftc_df = DataLoader.get_cftc_data(start, end, asset_conf['cftc_name'])
+        price_df = DataLoader.get_price_data(asset_conf['ticker'], start, end)
+        run("price.align", lambda: align_weekly(
+            cftc_df.sort_values('Date'), PriceStore.weekly_table(asset_conf['ticker']), "asof"
+        ))
+
+        sel_start, sel_end = default_analysis_range(combined)
+        run("analyze.default_range", lambda: MarketAnalyzer.analyze(combined, start=sel_start, end=sel_end))
+        run("analyze.full_range", lambda: MarketAnalyzer.analyze(combined))
+        run("backtest.full_range", lambda: Backtester.run(combined, start_date=f"{start}-01-01"))
+        run("chart.build_to_json", lambda: charts.plot_market_overview(
+            combined, price_df, asset_conf, analysis_range=(sel_start, sel_end)
+        ).to_json())
+    finally:
+        server.__exit__(None, None, None)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    out = {
+        "label": args.label,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "params": {k: v for k, v in vars(args).items() if k not in ("compare", "label")},
+        "env": {"python": platform.python_version(), "pandas": pd.__version__, "machine": platform.machine()},
+        "results": results,
+    }
+    out_path = os.path.join(ROOT, "benchmarks", "results", f"{args.label}.json")
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    with open(out_path, "w") as f:
+        json.dump(out, f, indent=2)
+    print(f"Saved {out_path}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"Regressions: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
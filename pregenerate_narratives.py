@@ -0,0 +1,105 @@
+"""
+Batch pre-generation of AI narratives after each weekly CFTC release.
+
+Checks the latest report date in the current-year TFF file. If it is newer than the
+last batch run, generates the narrative for every ASSET_CONFIG asset for the
+default view (DEFAULT_START_YEAR ~ current year, last DEFAULT_ANALYSIS_WEEKS weeks)
+concurrently and stores them in the narrative cache, and materializes each asset's
+default-view snapshot (src/snapshot.py), so the first user of the week gets the
+default view instantly.
+
+Usage (e.g. from cron on Friday evenings ET):
+    GEMINI_API_KEY=... python pregenerate_narratives.py [--force] [--workers 4]
+"""
+import os
+import json
+import argparse
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from src.config import ASSET_CONFIG, DEFAULT_START_YEAR, NARRATIVE_CACHE_DIR
+from src.data_loader import DataLoader
+from src.analysis.ai_narrator import AINarrator
+from src.snapshot import SnapshotStore
+
+STATE_FILE = os.path.join(NARRATIVE_CACHE_DIR, "last_batch.json")
+
+
+def read_state():
+    try:
+        with open(STATE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_state(state):
+    os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+    tmp_path = f"{STATE_FILE}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, STATE_FILE)
+
+
+def default_view_input(name, asset_conf):
+    """Builds the default-view snapshot; its analysis rows are the app's narrative input (same cache key)."""
+    current_year = datetime.datetime.now().year
+    combined_df, price_df = DataLoader.load_bundle(DEFAULT_START_YEAR, current_year, asset_conf)
+    if combined_df.empty or price_df.empty:
+        return None
+    snapshot = SnapshotStore.build(name, combined_df, price_df, asset_conf)
+    if snapshot is None:
+        return None
+    return SnapshotStore.analysis_df(snapshot)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--force", action="store_true", help="run even if no new report was published")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    api_key = os.environ.get("GEMINI_API_KEY")
+    if AINarrator.backend.requires_api_key and not api_key:
+        print("GEMINI_API_KEY is not set.")
+        return 1
+
+    report_date = DataLoader.latest_report_date()
+    if report_date is None:
+        print("Could not determine the latest CFTC report date.")
+        return 1
+
+    state = read_state()
+    if state.get("report_date") == report_date and not args.force:
+        print(f"No new report since {report_date}. Nothing to do.")
+        return 0
+    print(f"New report: {report_date} (previous batch: {state.get('report_date')})")
+
+    # Data loads share the per-year CFTC cache, so run them first, then the slow LLM calls concurrently
+    inputs = {name: default_view_input(name, conf) for name, conf in ASSET_CONFIG.items()}
+
+    def generate(name):
+        analysis_df = inputs[name]
+        if analysis_df is None:
+            return name, {"error": "No data for the default view."}
+        return name, AINarrator.generate_narrative(analysis_df, api_key)
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        for name, result in pool.map(generate, ASSET_CONFIG):
+            if "error" in result:
+                failed.append(name)
+                print(f"[FAIL] {name}: {result['error']}")
+            else:
+                print(f"[OK]   {name}: {result.get('header', '')[:60]}")
+
+    if failed:
+        # Keep the old state so the next run retries
+        return 1
+
+    write_state({"report_date": report_date, "generated_at": datetime.datetime.now().isoformat(timespec="seconds")})
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
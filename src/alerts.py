@@ -0,0 +1,101 @@
+import os
+import sys
+import json
+import threading
+from src.config import ALERT_SINKS, ALERT_WEBHOOK_TIMEOUT
+
+
+def format_alert(alert):
+    """One-line human readable text for an alert dict (see SignalWatcher.evaluate)."""
+    return (
+        f"[{alert['report_date']}] {alert['asset']}: {alert['pattern']} ({alert['signal']}) "
+        f"- Hedge fund shorts {alert['oi_pct']:+.1f}%, price {alert['price_pct']:+.1f}% w/w"
+    )
+
+
+class AlertSink:
+    """Alert destination interface. send() gets one alert dict; failures should raise."""
+    name = "base"
+
+    def send(self, alert):
+        raise NotImplementedError
+
+
+class FileSink(AlertSink):
+    """Appends alerts as JSON lines."""
+    name = "file"
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, alert):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(alert, ensure_ascii=False) + "\n")
+
+
+class WebhookSink(AlertSink):
+    """POSTs {"text": ..., "alert": {...}} (Slack/Discord-style "text" field + the raw alert)."""
+    name = "webhook"
+
+    def __init__(self, url, timeout=ALERT_WEBHOOK_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, alert):
+        import requests  # Lazy import
+
+        r = requests.post(self.url, json={"text": format_alert(alert), "alert": alert}, timeout=self.timeout)
+        r.raise_for_status()
+
+
+class StdoutSink(AlertSink):
+    name = "stdout"
+
+    def send(self, alert):
+        print(format_alert(alert), file=sys.stdout)
+
+
+class MemorySink(AlertSink):
+    """Keeps alerts in a list (local stand-in for webhooks in offline runs / checks)."""
+    name = "memory"
+
+    def __init__(self):
+        self.alerts = []
+
+    def send(self, alert):
+        self.alerts.append(alert)
+
+
+def create_sinks(spec=ALERT_SINKS):
+    """'file:alerts.jsonl,webhook:https://...,stdout' -> [AlertSink, ...]"""
+    sinks = []
+    for item in filter(None, (s.strip() for s in spec.split(","))):
+        kind, _, arg = item.partition(":")
+        if kind == "file":
+            sinks.append(FileSink(arg))
+        elif kind == "webhook":
+            sinks.append(WebhookSink(arg))
+        elif kind == "stdout":
+            sinks.append(StdoutSink())
+        elif kind == "memory":
+            sinks.append(MemorySink())
+        else:
+            raise ValueError(f"Unknown alert sink: {item}")
+    return sinks
+
+
+def dispatch(alerts, sinks):
+    """Sends every alert to every sink; one failing sink doesn't stop the others. Returns failures."""
+    failures = []
+    for alert in alerts:
+        for sink in sinks:
+            try:
+                sink.send(alert)
+            except Exception as e:
+                print(f"Alert sink '{sink.name}' failed: {e}")
+                failures.append((sink.name, alert, e))
+    return failures
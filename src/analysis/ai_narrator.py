@@ -1,113 +1,170 @@
-
-import google.generativeai as genai
 import pandas as pd
 import re
+import hashlib
+import time
+from src.analysis.narrative_cache import NarrativeCache
+from src.analysis.prompt_sampler import select_informative_rows, encode_rows
+from src.analysis.narrator_backends import create_backend
+from src import perf
+from src.singleflight import SingleFlight
 
 class AINarrator:
+    # Bump whenever the prompt template or row format changes (invalidates cached narratives)
+    PROMPT_VERSION = 2
+    # Token budget for the data rows in the prompt
+    PROMPT_TOKEN_BUDGET = 600
+
+    cache = NarrativeCache()
+    # LLM backend (Gemini or the offline replay stand-in), with deadline/retry/concurrency limits
+    backend = create_backend()
+    # Sessions asking for the same narrative at once share one LLM call (keyed like the cache,
+    # plus a hash of the API key: a session never runs on, or gets the errors of, another user's key)
+    flights = SingleFlight("narrator")
+
     @staticmethod
     def generate_narrative(range_df: pd.DataFrame, api_key: str):
         """
         Generates the 'Hedge Fund Confession' narrative using Gemini.
         Returns a dictionary with parsed sections.
+        Responses are cached on disk, keyed by the sampled rows, model and prompt version.
         """
-        if not api_key:
-            return {"error": "API Key is missing."}
-            
+        for event, payload in AINarrator.stream_narrative(range_df, api_key):
+            if event == "error":
+                return {"error": payload}
+            if event == "done":
+                return payload
+        return {"error": "Empty response."}
+
+    @staticmethod
+    def stream_narrative(range_df: pd.DataFrame, api_key: str):
+        """
+        Streaming variant of generate_narrative.
+        Yields (event, payload) tuples as soon as each tagged section is complete:
+        ("header", str), ("phase", dict), ("future", str), ("advice", str),
+        then ("done", parsed_result) or ("error", message).
+        """
+        backend = AINarrator.backend
+        if backend.requires_api_key and not api_key:
+            yield "error", "API Key is missing."
+            return
+
         try:
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel('gemini-2.0-flash-exp')
-            
-            # Prepare Prompt Data
-            sample_df = range_df.copy()
-            # Smart Sampling
-            if len(sample_df) > 30: 
-                    sample_df = sample_df.iloc[::len(sample_df)//30]
-            
-            prompt_rows = []
-            for idx, row in sample_df.iterrows():
-                prompt_rows.append(f"- {row['Date'].strftime('%Y-%m-%d')}: BTC Price ${row['Close']:,.0f}, **MY Short Position**: {row['Lev_Money_Positions_Short_All']:,.0f} contracts")
-            
-            prompt_text = f"""
-            [Role]
-            You are a ruthless, cynical, yet intellectually superior **Head Strategist** at a top Wall Street Hedge Fund.
-            You view retail investors ("Ants") not as people, but as **liquidity providers** who pay for your champagne.
-            You speak **perfect, professional Korean (Hangul)** with a tone of cold, calculated confidence.
-
-            [Input Data: Price vs **MY Short Contracts (OI)**]
-            {chr(10).join(prompt_rows)}
-
-            [YOUR CORE PHILOSOPHY: THE "HOUSE" ALWAYS WINS]
-            You do not gamble. You run a casino. You exploit the **"Structural Long Bias"** of the market.
-            *   **Retail Psychology:** They blindly believe "Number Go Up" (Bullish Sentiment).
-            *   **Your Edge:** You feed their greed by selling them expensive Futures (Premium) and buying cheap Spot.
-            *   **Gambler's Premium:** You profit from the leverage-addicted gamblers who pay premium & funding fees.
-
-            [STRATEGIC PLAYBOOK: 4 SEASONS OF MONEY MAKING]
-            Analyze the data by identifying which of these 4 modes you were in:
-
-            1.  **😇 The Farmer (Arbitrageur) - [Market: Uptrend/Bull]**
-                *   **Data:** Price ↗️ AND Short OI ↗️
-                *   **Logic:** "The ants are excited. Premium is widening. I buy Spot and SELL Futures to lock in risk-free yield."
-                *   **Narrative:** "Classic Cash-and-Carry. Planting seeds in their greed."
-
-            2.  **😈 The Predatory Hunter (Bear Raid) - [Market: Weak/Resistance]**
-                *   **Data:** Price ➡️/↘️ AND Short OI ↗️
-                *   **Logic:** "Momentum is fading. I dump Spot to trigger panic and pile into Short Futures."
-                *   **Narrative:** "They looked weak. I broke their support line to feed on their stop-losses."
-
-            3.  **🌾 The Harvester (Unwinding) - [Market: Downtrend/Crash]**
-                *   **Data:** Price ↘️ AND Short OI ↘️
-                *   **Logic:** "Panic is everywhere. Premium is gone. I buy back my cheap Futures to close the position."
-                *   **Narrative:** "Harvest season. While they cry over losses, I'm booking my guaranteed arbitrage profits."
-
-            4.  **💰 The Landlord (Funding Farming) - [Market: Sideways]**
-                *   **Data:** Price ➡️ AND Short OI ➡️
-                *   **Logic:** "Boring market? Good. I just hold and collect Funding Fees every 8 hours."
-                *   **Narrative:** "Collecting rent from the dreamers."
-
-            [INTERPRETATION RULES]
-            *   **NEVER** say "I lost money" because the market dropped. You hedged (Cash-and-Carry), so you profited from the *spread*, not the price.
-            *   **IF** Price skyrocketed and you reduced shorts (Price ↗️, OI ↘️), admit a **"Short Squeeze"** (Operational Failure): "The ants overpowered us. Forced to cover."
-
-            [Task]
-            Conduct a **Strategic Post-Mortem**.
-            Based on the data, reconstruct your psychological state and strategic moves for each phase.
-
-            [Output Format - Custom Tagging]
-            Use strict tags. No JSON.
-
-            <HEADER>
-            (One sentence summary of your masterful operation, e.g., "Milked the bull run and harvested the crash perfectly.")
-            </HEADER>
-            
-            <PHASE>
-            TITLE: (Creative Strategy Name, e.g., "Operation: Sheep Shearing")
-            PERIOD: YYYY-MM-DD ~ YYYY-MM-DD
-            CONTENT: 
-            **[Scenario]**: (Market atmosphere)
-            **[My Move]**: (Specific action: "Sold into strength", "Triggered cascade")
-            **[The Alpha]**: (Why this made money: "Captured 15% basis spread", "Farmed funding rates")
-            </PHASE>
-            
-            ... (Repeat for key phases) ...
-
-            <FUTURE>
-            (Your short-term outlook. Based on current Premium/Basis, what is your next move? 
-            - IF Premium High: "I will accumulate more positions."
-            - IF Premium Low/Negative: "I will unwind and leave.")
-            </FUTURE>
-            <ADVICE>
-            (A cynical piece of advice to the retail investor. e.g., "Stop paying me premiums and looking at charts. Go to work.")
-            </ADVICE>
-            """
-            
-            response = model.generate_content(prompt_text)
-            text_res = response.text
-            
-            return AINarrator.parse_response(text_res)
+            data_rows, prompt_text = AINarrator.build_prompt(range_df)
+
+            cache_key = NarrativeCache.make_key(data_rows, backend.model_name, AINarrator.PROMPT_VERSION)
+            cached_text = AINarrator.cache.get(cache_key)
+            if cached_text is not None:
+                perf.record("narrator.llm", 0.0, cache="hit", model=backend.model_name)
+                yield from NarrativeStreamParser().feed(cached_text)
+                yield "done", AINarrator.parse_response(cached_text)
+                return
+
+            parser = NarrativeStreamParser()
+            chunks = []
+            with perf.span("narrator.llm", cache="miss", model=backend.model_name) as llm_span:
+                t0 = time.perf_counter()
+                flight_key = (cache_key, hashlib.sha256((api_key or "").encode("utf-8")).hexdigest())
+                for chunk in AINarrator.flights.stream(flight_key, backend.stream, prompt_text, api_key):
+                    if not chunks:
+                        llm_span["first_chunk_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+                    chunks.append(chunk)
+                    yield from parser.feed(chunk)
+            text_res = "".join(chunks)
+
+            result = AINarrator.parse_response(text_res)
+            if "error" not in result:
+                AINarrator.cache.set(cache_key, text_res, model=backend.model_name, prompt_version=AINarrator.PROMPT_VERSION)
+                yield "done", result
+            else:
+                yield "error", result["error"]
 
         except Exception as e:
-            return {"error": str(e)}
+            yield "error", str(e)
+
+    @staticmethod
+    def build_prompt(range_df: pd.DataFrame):
+        """Returns (data_rows, prompt_text). data_rows is the sampled-data part used as the cache fingerprint."""
+        # Prepare Prompt Data
+        # Most informative weeks (regime boundaries, big moves, first/last) within a token budget,
+        # encoded as compact CSV instead of one sentence per row
+        sample_df = select_informative_rows(range_df, token_budget=AINarrator.PROMPT_TOKEN_BUDGET)
+        data_rows = encode_rows(sample_df)
+        
+        prompt_text = f"""
+        [Role]
+        You are a ruthless, cynical, yet intellectually superior **Head Strategist** at a top Wall Street Hedge Fund.
+        You view retail investors ("Ants") not as people, but as **liquidity providers** who pay for your champagne.
+        You speak **perfect, professional Korean (Hangul)** with a tone of cold, calculated confidence.
+
+        [Input Data: Price vs **MY Short Contracts (OI)**]
+        (CSV, key weeks only. short_oi = MY short contracts; *_chg_pct = change vs. the previous week)
+        {data_rows}
+
+        [YOUR CORE PHILOSOPHY: THE "HOUSE" ALWAYS WINS]
+        You do not gamble. You run a casino. You exploit the **"Structural Long Bias"** of the market.
+        *   **Retail Psychology:** They blindly believe "Number Go Up" (Bullish Sentiment).
+        *   **Your Edge:** You feed their greed by selling them expensive Futures (Premium) and buying cheap Spot.
+        *   **Gambler's Premium:** You profit from the leverage-addicted gamblers who pay premium & funding fees.
+
+        [STRATEGIC PLAYBOOK: 4 SEASONS OF MONEY MAKING]
+        Analyze the data by identifying which of these 4 modes you were in:
+
+        1.  **😇 The Farmer (Arbitrageur) - [Market: Uptrend/Bull]**
+            *   **Data:** Price ↗️ AND Short OI ↗️
+            *   **Logic:** "The ants are excited. Premium is widening. I buy Spot and SELL Futures to lock in risk-free yield."
+            *   **Narrative:** "Classic Cash-and-Carry. Planting seeds in their greed."
+
+        2.  **😈 The Predatory Hunter (Bear Raid) - [Market: Weak/Resistance]**
+            *   **Data:** Price ➡️/↘️ AND Short OI ↗️
+            *   **Logic:** "Momentum is fading. I dump Spot to trigger panic and pile into Short Futures."
+            *   **Narrative:** "They looked weak. I broke their support line to feed on their stop-losses."
+
+        3.  **🌾 The Harvester (Unwinding) - [Market: Downtrend/Crash]**
+            *   **Data:** Price ↘️ AND Short OI ↘️
+            *   **Logic:** "Panic is everywhere. Premium is gone. I buy back my cheap Futures to close the position."
+            *   **Narrative:** "Harvest season. While they cry over losses, I'm booking my guaranteed arbitrage profits."
+
+        4.  **💰 The Landlord (Funding Farming) - [Market: Sideways]**
+            *   **Data:** Price ➡️ AND Short OI ➡️
+            *   **Logic:** "Boring market? Good. I just hold and collect Funding Fees every 8 hours."
+            *   **Narrative:** "Collecting rent from the dreamers."
+
+        [INTERPRETATION RULES]
+        *   **NEVER** say "I lost money" because the market dropped. You hedged (Cash-and-Carry), so you profited from the *spread*, not the price.
+        *   **IF** Price skyrocketed and you reduced shorts (Price ↗️, OI ↘️), admit a **"Short Squeeze"** (Operational Failure): "The ants overpowered us. Forced to cover."
+
+        [Task]
+        Conduct a **Strategic Post-Mortem**.
+        Based on the data, reconstruct your psychological state and strategic moves for each phase.
+
+        [Output Format - Custom Tagging]
+        Use strict tags. No JSON.
+
+        <HEADER>
+        (One sentence summary of your masterful operation, e.g., "Milked the bull run and harvested the crash perfectly.")
+        </HEADER>
+        
+        <PHASE>
+        TITLE: (Creative Strategy Name, e.g., "Operation: Sheep Shearing")
+        PERIOD: YYYY-MM-DD ~ YYYY-MM-DD
+        CONTENT: 
+        **[Scenario]**: (Market atmosphere)
+        **[My Move]**: (Specific action: "Sold into strength", "Triggered cascade")
+        **[The Alpha]**: (Why this made money: "Captured 15% basis spread", "Farmed funding rates")
+        </PHASE>
+        
+        ... (Repeat for key phases) ...
+
+        <FUTURE>
+        (Your short-term outlook. Based on current Premium/Basis, what is your next move? 
+        - IF Premium High: "I will accumulate more positions."
+        - IF Premium Low/Negative: "I will unwind and leave.")
+        </FUTURE>
+        <ADVICE>
+        (A cynical piece of advice to the retail investor. e.g., "Stop paying me premiums and looking at charts. Go to work.")
+        </ADVICE>
+        """
+        return data_rows, prompt_text
 
     @staticmethod
     def parse_response(text_res):
@@ -121,16 +178,7 @@ class AINarrator:
             phase_matches = re.findall(r"<PHASE>(.*?)</PHASE>", text_res, re.DOTALL)
             
             for p_txt in phase_matches:
-                title_match = re.search(r"TITLE:\s*(.*)", p_txt)
-                period_match = re.search(r"PERIOD:\s*(.*)", p_txt)
-                # Content is everything after CONTENT:
-                content_match = re.search(r"CONTENT:\s*(.*)", p_txt, re.DOTALL)
-                
-                phases.append({
-                    "title": title_match.group(1).strip() if title_match else "Phase",
-                    "period": period_match.group(1).strip() if period_match else "",
-                    "narrative": content_match.group(1).strip() if content_match else p_txt.strip()
-                })
+                phases.append(AINarrator.parse_phase(p_txt))
             
             # Extract Footer
             future_match = re.search(r"<FUTURE>(.*?)</FUTURE>", text_res, re.DOTALL)
@@ -147,3 +195,44 @@ class AINarrator:
             }
         except Exception as e:
              return {"error": f"Parsing Error: {str(e)}", "raw": text_res}
+
+    @staticmethod
+    def parse_phase(p_txt):
+        title_match = re.search(r"TITLE:\s*(.*)", p_txt)
+        period_match = re.search(r"PERIOD:\s*(.*)", p_txt)
+        # Content is everything after CONTENT:
+        content_match = re.search(r"CONTENT:\s*(.*)", p_txt, re.DOTALL)
+        
+        return {
+            "title": title_match.group(1).strip() if title_match else "Phase",
+            "period": period_match.group(1).strip() if period_match else "",
+            "narrative": content_match.group(1).strip() if content_match else p_txt.strip()
+        }
+
+
+class NarrativeStreamParser:
+    """
+    Incremental parser for the tagged narrative format.
+    feed() accepts raw text chunks and returns the (event, payload) tuples for every
+    <HEADER>/<PHASE>/<FUTURE>/<ADVICE> block completed so far.
+    """
+    TAG_PATTERN = re.compile(r"<(HEADER|PHASE|FUTURE|ADVICE)>(.*?)</\1>", re.DOTALL)
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        events = []
+        while True:
+            match = self.TAG_PATTERN.search(self.buffer, self.pos)
+            if not match:
+                break
+            self.pos = match.end()
+            tag, body = match.group(1), match.group(2)
+            if tag == "PHASE":
+                events.append(("phase", AINarrator.parse_phase(body)))
+            else:
+                events.append((tag.lower(), body.strip()))
+        return events
@@ -0,0 +1,112 @@
+import pandas as pd
+
+
+class Backtester:
+    """
+    Weekly signal backtest (logic from backtest_simulation.py).
+    Classifies each week's OI/price change into a pattern and checks the T+horizon weeks return.
+    """
+
+    @staticmethod
+    def classify(w_oi_pct, w_price_pct):
+        """Returns (signal, pattern) for one week's OI/price change (%)."""
+        # 1. Bear Raid (Prioritized)
+        if w_price_pct < -3.0 and w_oi_pct > 5.0:
+            return "SELL", "Bear Raid 🩸" # Expect Down
+        # 2. Dip Buying (Accumulation)
+        if w_price_pct < -1.0 and w_oi_pct > 1.0:
+            return "BUY", "Dip Buy 🐜" # Expect Rebound
+        # 3. Strong Accumulation
+        if w_price_pct > 1.0 and w_oi_pct > 5.0:
+            return "BUY", "Strong Buy 🔥" # Trend Following
+        # 4. Squeeze / Profit Taking
+        if w_oi_pct < -5.0 and w_price_pct > 1.0:
+            return "SELL", "Squeeze 💥" # Short Squeeze (Usually temporary)
+        return "NEUTRAL", "NONE"
+
+    @staticmethod
+    def run(combined: pd.DataFrame, start_date="2024-01-01", horizon=4):
+        """
+        Returns {"ledger": DataFrame of signal weeks, "summary": dict}.
+        ledger columns: date, pattern, signal, oi_pct, price_pct, next_return, is_win
+        Signals use 'Close' (as of the report). With the aligned Price_Next_Open column
+        (DataLoader.load_all_data), the outcome is measured from the first open after the
+        release to the open `horizon` weeks later, i.e. only with prices tradable after the
+        signal was public. Without it, falls back to Close-to-Close.
+        """
+        ledger = []
+        wins = losses = 0
+        bear_raid_wins = bear_raid_count = 0
+        accum_wins = accum_count = 0
+
+        dates = pd.to_datetime(combined['Date']).dt.strftime('%Y-%m-%d').to_numpy()
+        oi = combined['Lev_Money_Positions_Short_All'].to_numpy()
+        price = combined['Close'].to_numpy()
+        entry_price = combined['Price_Next_Open'].to_numpy() if 'Price_Next_Open' in combined.columns else price
+
+        for i in range(1, len(combined) - horizon): # -horizon to have Next N Weeks Data
+            date_str = dates[i]
+            if date_str < start_date:
+                continue
+
+            c_oi, p_oi = oi[i], oi[i - 1]
+            c_price, p_price = price[i], price[i - 1]
+            if p_oi == 0 or p_price == 0: continue
+
+            w_oi_pct = ((c_oi - p_oi) / p_oi) * 100
+            w_price_pct = ((c_price - p_price) / p_price) * 100
+
+            # Outcome (Next N Weeks Return)
+            entry, exit_ = entry_price[i], entry_price[i + horizon]
+            if pd.isna(entry) or pd.isna(exit_) or entry == 0: continue
+            next_return = ((exit_ - entry) / entry) * 100
+
+            signal, pattern = Backtester.classify(w_oi_pct, w_price_pct)
+            if signal == "NEUTRAL":
+                continue
+
+            # --- Evaluation ---
+            is_win = False
+            if signal == "BUY":
+                accum_count += 1
+                if next_return > 0:
+                    is_win = True
+                    accum_wins += 1
+            else:
+                if "Bear Raid" in pattern:
+                    bear_raid_count += 1
+                if next_return < 0: # Predicted Drop
+                    is_win = True
+                    if "Bear Raid" in pattern: bear_raid_wins += 1
+
+            if is_win:
+                wins += 1
+            else:
+                losses += 1
+
+            ledger.append({
+                "date": date_str,
+                "pattern": pattern,
+                "signal": signal,
+                "oi_pct": w_oi_pct,
+                "price_pct": w_price_pct,
+                "next_return": next_return,
+                "is_win": is_win
+            })
+
+        total_trades = wins + losses
+        summary = {
+            "total_signals": total_trades,
+            "wins": wins,
+            "losses": losses,
+            "win_rate": (wins / total_trades * 100) if total_trades > 0 else 0,
+            "bear_raid_wins": bear_raid_wins,
+            "bear_raid_count": bear_raid_count,
+            "accum_wins": accum_wins,
+            "accum_count": accum_count,
+            "horizon_weeks": horizon,
+            "start_date": start_date
+        }
+
+        ledger_df = pd.DataFrame(ledger, columns=["date", "pattern", "signal", "oi_pct", "price_pct", "next_return", "is_win"])
+        return {"ledger": ledger_df, "summary": summary}
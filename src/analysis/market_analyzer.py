@@ -1,23 +1,33 @@
 
 import pandas as pd
 import datetime
+from src.timeseries import select_range
+from src.analysis.positioning import Positioning
+from src.analysis.weekly_log import WeeklyLogs
+from src import perf
 
 class MarketAnalyzer:
     @staticmethod
-    def analyze(range_df: pd.DataFrame):
+    @perf.timed("MarketAnalyzer.analyze")
+    def analyze(range_df: pd.DataFrame, start=None, end=None):
         """
         Analyzes the filtered DataFrame (Daily).
+        If start/end are given, the range is sliced here via the sorted Date index.
         Logic partially adapted from original app.py Smart Money Analysis Engine.
         """
         result = {
             "is_valid": False,
             "metrics": {},
             "trend": {},
-            "weekly_logs": [],
+            "weekly_logs": WeeklyLogs.empty(),
             "verdict": {},
+            "positioning": {}, # Latest week per trader category (see Positioning)
             "analysis_df": None # The weekly resampled DF
         }
 
+        if start is not None or end is not None:
+            range_df = select_range(range_df, start, end)
+
         # 1. Weekly Resampling
         # range_df is DAILY (Price). CFTC is WEEKLY.
         # Resample to Weekly (Friday) to align with CFTC release cycle.
@@ -137,6 +147,8 @@ class MarketAnalyzer:
                 trend_desc = "방향성 없이 물량이 서서히 줄어들고 있습니다."
                 trend_color = "red"
 
+        result['positioning'] = Positioning.latest(analysis_df)
+
         result['trend'] = {
             "status": trend_status,
             "desc": trend_desc,
@@ -144,143 +156,13 @@ class MarketAnalyzer:
         }
 
         # --- Weekly Logs (Log Logic) ---
-        weekly_logs = []
-        market_mode = "NEUTRAL"
-        
-        # Iterate excluding the first row (since we need prev row)
-        # analysis_df is already strictly sorted by date/resampled
+        # Columnar codes only; text is rendered for displayed rows (WeeklyLogs.render)
         temp_df = analysis_df.drop_duplicates(subset=['Date'], keep='last')
-        
-        if len(temp_df) >= 2:
-            for i in range(1, len(temp_df)):
-                curr_row = temp_df.iloc[i]
-                prev_row = temp_df.iloc[i-1]
-                
-                curr_date = curr_row['Date'].strftime('%Y-%m-%d')
-                current_month = curr_row['Date'].month
-                
-                c_oi = curr_row['Lev_Money_Positions_Short_All']
-                p_oi = prev_row['Lev_Money_Positions_Short_All']
-                c_price = curr_row['Close']
-                p_price = prev_row['Close']
-                
-                w_oi_pct = ((c_oi - p_oi) / p_oi) * 100 if p_oi != 0 else 0
-                w_price_pct = ((c_price - p_price) / p_price) * 100 if p_price != 0 else 0
-                
-                ACT_THRES = 2.0
-                
-                intent_emoji = "😐"
-                intent_title = "관망 (Wait)"
-                intent_desc = "유의미한 변화가 없습니다."
-                prediction_text = "당분간 횡보가 예상됩니다."
-
-                # Logic Tree (Same as app.py)
-                if w_oi_pct > ACT_THRES:
-                    if w_price_pct < -3.0 and w_oi_pct > 5.0:
-                        market_mode = "HUNTER"
-                        intent_emoji = "🩸"
-                        intent_title = "공매도 공격 (Bear Raid)"
-                        intent_desc = f"현물 투매로 가격 폭락({w_price_pct:.1f}%)을 유도하고, 선물 숏을 기습적으로 늘려(+{w_oi_pct:.1f}%) **약탈적 사냥 모드**에 진입했습니다."
-                        prediction_text = "세력의 의도적인 하락 유도입니다. 바닥 신호가 나올 때까지 절대 진입하지 마세요."
-                    elif w_price_pct > 1.0:
-                        market_mode = "FARMER"
-                        intent_emoji = "🌱"
-                        intent_title = "이모작 시작 (Momentum Farming)"
-                        intent_desc = "상승장에 맞추어 **무위험 차익거래(현물매수+선물매도) 농사**를 시작했습니다. (건전한 진입)"
-                        prediction_text = "상승 모멘텀이 강화될 것입니다. 단기 과열 여부만 체크하세요."
-                    elif w_price_pct < -1.0:
-                        market_mode = "FARMER"
-                        intent_emoji = "🐜"
-                        intent_title = "저가 씨뿌리기 (Dip Buying)"
-                        intent_desc = f"가격 하락({w_price_pct:.1f}%)을 기회로 삼아 **저렴한 값에 현물을 매집**하고 숏 포지션을 구축했습니다."
-                        prediction_text = "스마트 머니의 저가 매수세가 확인되었습니다. 물량 확보 후 반등 가능성이 높습니다."
-                    else:
-                        market_mode = "FARMER"
-                        intent_emoji = "📦"
-                        intent_title = "매집 축적 (Accumulation)"
-                        intent_desc = "가격을 자극하지 않고 조용히 포지션을 늘리고 있습니다."
-                        prediction_text = "에너지가 응축되고 있습니다. 곧 시세 분출이 예상됩니다."
-
-                elif w_oi_pct < -ACT_THRES:
-                    if current_month == 12:
-                         market_mode = "NEUTRAL"
-                         intent_emoji = "💰"
-                         intent_title = "연말 수익 확정 (Book Closing)"
-                         intent_desc = "연말 보너스 확정을 위해 **1년 농사를 모두 수익 실현**하고 장부를 마감했습니다."
-                         prediction_text = "메이저 자금이 휴가를 떠났습니다. 산타 랠리(빈집털이) 혹은 횡보가 예상됩니다."
-                    elif current_month in [3, 6, 9]:
-                         intent_emoji = "🔄"
-                         intent_title = "분기 만기 롤오버 (Rollover)"
-                         intent_desc = "만기를 앞두고 포지션을 교체하고 있습니다. 추세 변화가 아닌 **단순 교체 작업**입니다."
-                         prediction_text = "롤오버가 끝나면 기존 추세가 이어질 것입니다."
-                    else:
-                        if market_mode == "HUNTER":
-                            if w_price_pct < -1.0:
-                                intent_emoji = "🍖"
-                                intent_title = "전리품 챙기기 (Looting)"
-                                intent_desc = "공매도 공격 성공 후, **하락장에서 막대한 수익을 실현(익절)**하고 있습니다."
-                                prediction_text = "세력이 배불리 먹고 있습니다. 매도 압력이 해소되면 기술적 반등이 올 것입니다."
-                            elif w_price_pct > 1.0:
-                                intent_emoji = "😎"
-                                intent_title = "작전 종료 (Mission Accomplished)"
-                                intent_desc = "공격 목표 달성 후 남은 물량을 정리하며 유유히 시장을 떠나고 있습니다."
-                                prediction_text = "작전이 끝났습니다. 세력이 떠난 자리는 당분간 방향성 없는 움직임이 예상됩니다."
-                            else:
-                                intent_emoji = "📉"
-                                intent_title = "사냥 종료 (End Hunt)"
-                                intent_desc = "공격 포지션을 정리하고 있습니다."
-                                prediction_text = "변동성이 줄어들 것입니다."
-                        elif market_mode == "FARMER":
-                            if w_price_pct < -1.0:
-                                intent_emoji = "🌾"
-                                intent_title = "가을 수확 (Harvesting)"
-                                intent_desc = "기르던 포지션을 정리하며 **정상적인 차익거래 수익을 실현**하고 있습니다. (패닉 셀이 아님)"
-                                prediction_text = "수익 실현 매물이 나오고 있습니다. 건전한 조정 과정입니다."
-                            elif w_price_pct > 1.0:
-                                intent_emoji = "🔥"
-                                intent_title = "흉작/스퀴즈 (Squeeze)"
-                                intent_desc = "예상치 못한 급등으로 **농사가 실패하고 강제 청산(Stop Loss)** 당했습니다."
-                                prediction_text = "강제 청산 물량이 소진되면 급락할 위험이 있습니다."
-                            else:
-                                intent_emoji = "📉"
-                                intent_title = "포지션 축소 (Reduce)"
-                                intent_desc = "리스크 관리를 위해 비중을 줄이고 있습니다."
-                                prediction_text = "관망세가 짙어질 것입니다."
-                        else: # NEUTRAL
-                            if w_price_pct < -1.0:
-                                intent_emoji = "🏃"
-                                intent_title = "이탈 (Exit)"
-                                intent_desc = "시장 전망 악화로 시장을 떠나고 있습니다."
-                                prediction_text = "하락 추세가 지속될 수 있습니다."
-                            elif w_price_pct > 1.0:
-                                intent_emoji = "💸"
-                                intent_title = "숏 스퀴즈 (Short Squeeze)"
-                                intent_desc = "가격 급등으로 인한 강제 청산이 발생했습니다."
-                                prediction_text = "추격 매수를 자제하세요."
-                            else:
-                                intent_emoji = "📉"
-                                intent_title = "비중 축소 (De-leveraging)"
-                                intent_desc = "관망을 위해 포지션을 줄이고 있습니다."
-                                prediction_text = "횡보장이 예상됩니다."
-                else:
-                    market_mode = "NEUTRAL"
-                    intent_emoji = "😐"
-                    intent_title = "관망 (Wait)"
-                    intent_desc = "유의미한 포지션 변화가 없습니다. 기존 차익거래 포지션을 유지(Carry) 중입니다."
-                    prediction_text = "당분간 횡보하거나 현재 추세가 완만하게 이어질 것입니다."
-                
-                weekly_logs.append({
-                    "date": curr_date,
-                    "oi_delta": w_oi_pct,
-                    "price_delta": w_price_pct,
-                    "emoji": intent_emoji,
-                    "title": intent_title,
-                    "desc": intent_desc,
-                    "pred": prediction_text
-                })
-
-        weekly_logs.reverse()
-        result['weekly_logs'] = weekly_logs
+        result['weekly_logs'] = WeeklyLogs.build(
+            temp_df['Date'].to_numpy(),
+            temp_df['Lev_Money_Positions_Short_All'].to_numpy(),
+            temp_df['Close'].to_numpy(),
+        )
 
         # --- Final Verdict ---
         final_verdict = ""
@@ -0,0 +1,88 @@
+import os
+import json
+import time
+import hashlib
+from src.config import NARRATIVE_CACHE_DIR, NARRATIVE_CACHE_TTL, NARRATIVE_CACHE_MAX_BYTES
+
+
+class NarrativeCache:
+    """
+    On-disk cache of raw LLM narrative responses.
+    One JSON file per key; entries expire after `ttl` seconds and the oldest files
+    are evicted once the directory grows past `max_bytes`.
+    """
+
+    def __init__(self, cache_dir=NARRATIVE_CACHE_DIR, ttl=NARRATIVE_CACHE_TTL, max_bytes=NARRATIVE_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def make_key(data_rows, model_name, prompt_version):
+        """Fingerprint of the sampled data rows + model + prompt template version."""
+        h = hashlib.sha256()
+        h.update(f"{model_name}\n{prompt_version}\n".encode("utf-8"))
+        h.update(data_rows.encode("utf-8"))
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """Returns the cached response text, or None on miss/expiry/corruption."""
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry.get("created", 0) > self.ttl:
+            self._remove(path)
+            return None
+        return entry.get("text")
+
+    def set(self, key, text, **meta):
+        """Stores the response text atomically, then enforces the size bound."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        entry = {"created": time.time(), "text": text, **meta}
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Drops expired entries, then the oldest ones until the cache fits in max_bytes."""
+        try:
+            names = [n for n in os.listdir(self.cache_dir) if n.endswith(".json")]
+        except OSError:
+            return
+
+        now = time.time()
+        files = []
+        for name in names:
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if now - st.st_mtime > self.ttl:
+                self._remove(path)
+            else:
+                files.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
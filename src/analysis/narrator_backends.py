@@ -0,0 +1,194 @@
+import time
+import random
+import hashlib
+import threading
+from collections import OrderedDict
+from src.config import (
+    NARRATOR_BACKEND, NARRATOR_MODEL, NARRATOR_TIMEOUT,
+    NARRATOR_MAX_CONCURRENCY, NARRATOR_MAX_RETRIES, NARRATOR_REPLAY_LATENCY
+)
+
+
+class NarratorBackend:
+    """
+    LLM backend interface for AINarrator.
+    stream() yields the response text in chunks and must give up after `timeout` seconds.
+    """
+    model_name = "base"
+    requires_api_key = False
+
+    def stream(self, prompt_text, api_key, timeout):
+        raise NotImplementedError
+
+    def is_retryable(self, exc):
+        return isinstance(exc, (TimeoutError, ConnectionError))
+
+
+class GeminiBackend(NarratorBackend):
+    """Google Gemini via the generativelanguage client of google-generativeai (imported lazily)."""
+    requires_api_key = True
+    max_clients = 32
+
+    # One client per API key (the key goes in its client_options, so no process-global
+    # genai.configure() and no private SDK attributes). Small LRU keyed by a hash of the key:
+    # memory stays bounded and raw keys aren't kept as dict keys.
+    _lock = threading.Lock()
+    _clients = OrderedDict()
+
+    def __init__(self, model_name=NARRATOR_MODEL):
+        self.model_name = model_name
+
+    def _client_for(self, api_key):
+        from google.ai import generativelanguage as glm
+
+        key_hash = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+        with self._lock:
+            client = self._clients.get(key_hash)
+            if client is not None:
+                self._clients.move_to_end(key_hash)
+                return client
+        client = glm.GenerativeServiceClient(client_options={"api_key": api_key})
+        with self._lock:
+            self._clients[key_hash] = client
+            while len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+        return client
+
+    def stream(self, prompt_text, api_key, timeout):
+        from google.ai import generativelanguage as glm
+
+        request = glm.GenerateContentRequest(
+            model=f"models/{self.model_name}",
+            contents=[glm.Content(role="user", parts=[glm.Part(text=prompt_text)])],
+        )
+        for response in self._client_for(api_key).stream_generate_content(request=request, timeout=timeout):
+            for candidate in response.candidates[:1]:
+                yield "".join(part.text for part in candidate.content.parts)
+
+    def is_retryable(self, exc):
+        if super().is_retryable(exc):
+            return True
+        from google.api_core import exceptions as gexc
+        return isinstance(exc, (
+            gexc.ServiceUnavailable, gexc.ResourceExhausted, gexc.DeadlineExceeded, gexc.InternalServerError
+        ))
+
+
+REPLAY_SAMPLE_RESPONSE = """<HEADER>
+상승장의 탐욕을 수확하고, 하락장의 공포를 장부에 옮겨 적었습니다.
+</HEADER>
+<PHASE>
+TITLE: 작전명: 양털 깎기
+PERIOD: {start} ~ {mid}
+CONTENT:
+**[Scenario]**: 개미들이 "Number Go Up"을 외치며 프리미엄을 지불했습니다.
+**[My Move]**: 현물을 사고 선물을 팔아 베이시스를 고정했습니다.
+**[The Alpha]**: 가격 방향과 무관한 연 12%의 확정 스프레드.
+</PHASE>
+<PHASE>
+TITLE: 작전명: 가을 수확
+PERIOD: {mid} ~ {end}
+CONTENT:
+**[Scenario]**: 프리미엄이 사라지고 공포가 번졌습니다.
+**[My Move]**: 싸진 선물을 되사며 포지션을 정리했습니다.
+**[The Alpha]**: 쌓아둔 차익거래 수익을 실현했습니다.
+</PHASE>
+<FUTURE>
+프리미엄이 다시 벌어지면 포지션을 재구축합니다.
+</FUTURE>
+<ADVICE>
+차트 그만 보고 출근하세요.
+</ADVICE>
+"""
+
+
+class ReplayBackend(NarratorBackend):
+    """
+    Deterministic local stand-in: replays canned responses with configurable latency,
+    so the narrative path can be load-tested offline without an API key.
+    The response is picked by prompt hash, so the same prompt always gets the same text.
+    """
+    model_name = "replay"
+
+    def __init__(self, responses=None, latency=NARRATOR_REPLAY_LATENCY, chunk_size=80, chunk_delay=0.0):
+        self.responses = responses or [REPLAY_SAMPLE_RESPONSE.format(start="시작", mid="중반", end="현재")]
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+
+    def stream(self, prompt_text, api_key, timeout):
+        digest = int(hashlib.sha256(prompt_text.encode("utf-8")).hexdigest(), 16)
+        text = self.responses[digest % len(self.responses)]
+
+        if self.latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"Replay backend exceeded the {timeout:.1f}s deadline.")
+        time.sleep(self.latency)
+
+        for i in range(0, len(text), self.chunk_size):
+            if i and self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            yield text[i:i + self.chunk_size]
+
+
+class ResilientBackend(NarratorBackend):
+    """
+    Wraps a backend with a per-call deadline, bounded concurrency and retry with
+    exponential backoff (+ jitter). A call is only retried if no chunk was yielded yet,
+    since partial output may already be on screen.
+    """
+
+    def __init__(self, backend, timeout=NARRATOR_TIMEOUT, max_concurrency=NARRATOR_MAX_CONCURRENCY,
+                 max_retries=NARRATOR_MAX_RETRIES, backoff=1.0):
+        self.backend = backend
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+
+    @property
+    def model_name(self):
+        return self.backend.model_name
+
+    @property
+    def requires_api_key(self):
+        return self.backend.requires_api_key
+
+    def is_retryable(self, exc):
+        return self.backend.is_retryable(exc)
+
+    def stream(self, prompt_text, api_key, timeout=None):
+        deadline = time.monotonic() + (timeout or self.timeout)
+
+        # Waiting for a free slot counts against the deadline
+        if not self._semaphore.acquire(timeout=max(deadline - time.monotonic(), 0)):
+            raise TimeoutError("Too many concurrent narrative requests.")
+        try:
+            attempt = 0
+            while True:
+                started = False
+                try:
+                    for chunk in self.backend.stream(prompt_text, api_key, timeout=max(deadline - time.monotonic(), 0.1)):
+                        started = True
+                        if time.monotonic() > deadline:
+                            raise TimeoutError("Narrative generation exceeded its deadline.")
+                        yield chunk
+                    return
+                except Exception as e:
+                    remaining = deadline - time.monotonic()
+                    if started or attempt >= self.max_retries or remaining <= 0 or not self.backend.is_retryable(e):
+                        raise
+                    delay = min(self.backoff * (2 ** attempt) * (0.5 + random.random()), remaining)
+                    attempt += 1
+                    print(f"Narrator call failed ({e}); retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                    time.sleep(delay)
+        finally:
+            self._semaphore.release()
+
+
+def create_backend(name=NARRATOR_BACKEND):
+    """Builds the configured backend wrapped with deadline/concurrency/retry handling."""
+    backends = {"gemini": GeminiBackend, "replay": ReplayBackend}
+    if name not in backends:
+        raise ValueError(f"Unknown narrator backend: {name}")
+    return ResilientBackend(backends[name]())
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from numpy.lib.stride_tricks import sliding_window_view
+from src.config import ASSET_CONFIG, PANEL_DEFAULT_WINDOW, PANEL_DEFAULT_MAX_LAG
+from src.data_loader import DataLoader
+from src import perf
+
+# Panel series per market (weekly % change; levels would only correlate through trend)
+PANEL_SERIES = {
+    "shorts": "Lev_Money_Positions_Short_All", # Hedge fund (leveraged funds) shorts
+    "prices": "Close",
+}
+
+# Matrix modes: (row series, column series)
+PANEL_MODES = {
+    "shorts": ("shorts", "shorts"),
+    "prices": ("prices", "prices"),
+    "shorts_vs_prices": ("shorts", "prices"),
+}
+
+
+def rolling_corr(a, b, window):
+    """
+    Rolling Pearson correlation of every column of a (T x N) with every column of b (T x M).
+    Returns (T - window + 1, N, M); row t covers weeks [t, t + window).
+    """
+    wa = sliding_window_view(a, window, axis=0)  # (T', N, w) views, no copies
+    wb = sliding_window_view(b, window, axis=0)
+    wa = wa - wa.mean(axis=2, keepdims=True)
+    wb = wb - wb.mean(axis=2, keepdims=True)
+    cov = np.einsum("tiw,tjw->tij", wa, wb)
+    norm = np.sqrt(np.einsum("tiw,tiw->ti", wa, wa))[:, :, None] * np.sqrt(np.einsum("tjw,tjw->tj", wb, wb))[:, None, :]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(norm > 0, cov / norm, np.nan)
+
+
+def lead_lag_corr(a, b, max_lag):
+    """
+    corr(a_i[t], b_j[t + k]) for k = -max_lag..max_lag -> (2 * max_lag + 1, N, M).
+    k > 0: row market leads column market by k weeks. Every lag uses the same weeks of a.
+    """
+    n = len(a) - 2 * max_lag
+    if n < 3:
+        return np.full((2 * max_lag + 1, a.shape[1], b.shape[1]), np.nan)
+    a_mid = a[max_lag:max_lag + n]                      # (n, N)
+    b_shifted = sliding_window_view(b, n, axis=0)       # (2L+1, M, n): b[k:k+n] for k = 0..2L
+    az = (a_mid - a_mid.mean(axis=0)) / a_mid.std(axis=0)
+    bz = (b_shifted - b_shifted.mean(axis=2, keepdims=True)) / b_shifted.std(axis=2, keepdims=True)
+    with np.errstate(invalid="ignore"):
+        return np.einsum("ni,kjn->kij", az, bz) / n
+
+
+class PanelAnalyzer:
+    """
+    Cross-asset panel: aligned weekly matrix of hedge fund shorts and prices for several markets,
+    with rolling correlation and lead/lag matrices for every pair at once.
+    """
+
+    @staticmethod
+    @perf.timed("PanelAnalyzer.build_panel")
+    def build_panel(start_year, end_year, asset_names):
+        """
+        {"shorts": DataFrame, "prices": DataFrame} (report date x market), weekly % changes,
+        aligned on the report dates all markets share. Markets without data are dropped.
+        """
+        frames = {}
+        for name in asset_names:
+            df = DataLoader.load_all_data(start_year, end_year, ASSET_CONFIG[name])
+            if not df.empty:
+                frames[name] = df[list(PANEL_SERIES.values())]
+        if not frames:
+            return {key: pd.DataFrame() for key in PANEL_SERIES}
+
+        wide = pd.concat(frames, axis=1, join="inner")  # columns: (market, series)
+        changes = wide.pct_change(fill_method=None).iloc[1:].replace([np.inf, -np.inf], np.nan).dropna()
+        return {key: changes.xs(col, axis=1, level=1) for key, col in PANEL_SERIES.items()}
+
+    @staticmethod
+    @st.cache_data(ttl=3600*12, show_spinner=False)
+    def compute(start_year, end_year, asset_names, window=PANEL_DEFAULT_WINDOW, max_lag=PANEL_DEFAULT_MAX_LAG, data_version=None):
+        """
+        Rolling and lead/lag correlation matrices for every PANEL_MODES entry.
+        data_version (latest report date) is only part of the cache key: a new report -> new entry.
+        """
+        perf.annotate(cache="miss")
+        panel = PanelAnalyzer.build_panel(start_year, end_year, list(asset_names))
+        markets = list(panel["shorts"].columns)
+        result = {"markets": markets, "dates": [], "modes": {}, "window": window, "max_lag": max_lag}
+        if len(panel["shorts"]) < window or len(markets) < 2:
+            return result
+
+        # Window end dates (one per rolling matrix)
+        result["dates"] = list(panel["shorts"].index[window - 1:])
+        with perf.span("panel.correlations", markets=len(markets), weeks=len(panel["shorts"])):
+            for mode, (row_key, col_key) in PANEL_MODES.items():
+                a = panel[row_key].to_numpy(dtype=float)
+                b = panel[col_key].to_numpy(dtype=float)
+                result["modes"][mode] = {
+                    "rolling": rolling_corr(a, b, window),
+                    "lead_lag": lead_lag_corr(a, b, max_lag),
+                }
+        return result
+
+    @staticmethod
+    def average_pairwise(rolling, symmetric=True):
+        """Mean off-diagonal correlation per window -> (T',) (co-movement regime over time)."""
+        n = rolling.shape[1]
+        if symmetric:
+            mask = ~np.eye(n, rolling.shape[2], dtype=bool)
+            return np.nanmean(rolling[:, mask], axis=1)
+        return np.nanmean(rolling.reshape(len(rolling), -1), axis=1)
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+from src.config import TRADER_CATEGORIES, COT_INDEX_WEEKS
+from src import perf
+
+
+class Positioning:
+    """
+    Derived positioning metrics for every TFF trader category, in one vectorized pass.
+    Per category prefix (e.g. "Lev_Money"):
+      {cat}_Net            long - short (contracts)
+      {cat}_LS_Ratio       long / short (NaN when short is 0)
+      {cat}_Long_USD       long * multiplier * Close
+      {cat}_Short_USD      short * multiplier * Close
+      {cat}_Net_USD        net * multiplier * Close
+      {cat}_COT_Index      0~100, net position within its rolling COT_INDEX_WEEKS range
+      {cat}_Net_Z          z-score of net vs. its rolling COT_INDEX_WEEKS mean/std
+    Rolling metrics need half a window of history; earlier weeks are NaN
+    (so they depend on the loaded start year).
+    """
+    METRICS = ("Net", "LS_Ratio", "Long_USD", "Short_USD", "Net_USD", "COT_Index", "Net_Z")
+
+    @staticmethod
+    def derived_columns(df):
+        """Derived metric columns present in df."""
+        return [f"{cat}_{m}" for m in Positioning.METRICS for cat in TRADER_CATEGORIES if f"{cat}_{m}" in df.columns]
+
+    @staticmethod
+    def categories(df):
+        """Category prefixes with both long and short columns present in df."""
+        return [
+            cat for cat in TRADER_CATEGORIES
+            if f"{cat}_Positions_Long_All" in df.columns and f"{cat}_Positions_Short_All" in df.columns
+        ]
+
+    @staticmethod
+    @perf.timed("Positioning.compute")
+    def compute(weekly_df: pd.DataFrame, multiplier, window=COT_INDEX_WEEKS):
+        """Returns a DataFrame of derived columns aligned to weekly_df's index (one row per report)."""
+        cats = Positioning.categories(weekly_df)
+        if not cats:
+            return pd.DataFrame(index=weekly_df.index)
+
+        # (weeks x categories) matrices -> every metric is one array op for all categories
+        longs = weekly_df[[f"{c}_Positions_Long_All" for c in cats]].to_numpy(dtype=float)
+        shorts = weekly_df[[f"{c}_Positions_Short_All" for c in cats]].to_numpy(dtype=float)
+        net = longs - shorts
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ls_ratio = np.where(shorts > 0, longs / shorts, np.nan)
+
+        close = weekly_df["Close"].to_numpy(dtype=float) if "Close" in weekly_df.columns else np.full(len(weekly_df), np.nan)
+        usd_per_contract = (close * multiplier)[:, None]
+
+        net_frame = pd.DataFrame(net)
+        rolling = net_frame.rolling(window, min_periods=max(2, window // 2))
+        r_min, r_max = rolling.min().to_numpy(), rolling.max().to_numpy()
+        r_mean, r_std = rolling.mean().to_numpy(), rolling.std().to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cot_index = np.where(r_max > r_min, (net - r_min) / (r_max - r_min) * 100, np.nan)
+            net_z = np.where(r_std > 0, (net - r_mean) / r_std, np.nan)
+
+        metrics = {
+            "Net": net,
+            "LS_Ratio": ls_ratio,
+            "Long_USD": longs * usd_per_contract,
+            "Short_USD": shorts * usd_per_contract,
+            "Net_USD": net * usd_per_contract,
+            "COT_Index": cot_index,
+            "Net_Z": net_z,
+        }
+        columns = {
+            f"{cat}_{name}": values[:, i]
+            for name, values in metrics.items()
+            for i, cat in enumerate(cats)
+        }
+        return pd.DataFrame(columns, index=weekly_df.index)
+
+    @staticmethod
+    def add_metrics(weekly_df: pd.DataFrame, multiplier, window=COT_INDEX_WEEKS):
+        """weekly_df with the derived columns appended (existing derived columns are replaced)."""
+        derived = Positioning.compute(weekly_df, multiplier, window)
+        base = weekly_df.drop(columns=[c for c in derived.columns if c in weekly_df.columns])
+        return pd.concat([base, derived], axis=1)
+
+    @staticmethod
+    def latest(weekly_df: pd.DataFrame):
+        """{category: {net, ls_ratio, net_usd, cot_index, net_z}} for the last row (NaN -> None)."""
+        if weekly_df.empty:
+            return {}
+        row = weekly_df.iloc[-1]
+        summary = {}
+        for cat in Positioning.categories(weekly_df):
+            if f"{cat}_Net" not in weekly_df.columns:
+                continue
+            summary[cat] = {
+                key: (None if pd.isna(row[f"{cat}_{col}"]) else float(row[f"{cat}_{col}"]))
+                for key, col in (("net", "Net"), ("ls_ratio", "LS_Ratio"), ("net_usd", "Net_USD"),
+                                 ("cot_index", "COT_Index"), ("net_z", "Net_Z"))
+            }
+        return summary
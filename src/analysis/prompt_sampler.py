@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+OI_COL = 'Lev_Money_Positions_Short_All'
+
+# Rough token cost of one compact CSV row ("2025-01-03,97234,15234,+3.2,-1.1")
+TOKENS_PER_ROW = 20
+HEADER = "date,close_usd,short_oi,oi_chg_pct,price_chg_pct"
+
+# Weekly OI move that counts as a position change (same as MarketAnalyzer's ACT_THRES)
+ACT_THRES = 2.0
+
+
+def select_informative_rows(weekly_df: pd.DataFrame, token_budget=600):
+    """
+    Picks the most informative weeks for the narrator prompt instead of a fixed stride:
+    first/last week, regime boundaries (OI direction flips) and the largest OI/price moves,
+    until `token_budget` is filled. Returns the selected rows in date order, with
+    week-over-week changes computed on the full series (so skipped weeks still count).
+    """
+    df = weekly_df[['Date', 'Close', OI_COL]].copy()
+    df['oi_chg_pct'] = df[OI_COL].pct_change() * 100
+    df['price_chg_pct'] = df['Close'].pct_change() * 100
+
+    max_rows = max(int(token_budget // TOKENS_PER_ROW) - 1, 2)  # -1 for the header line
+    n = len(df)
+    if n <= max_rows:
+        return df
+
+    oi_chg = df['oi_chg_pct'].fillna(0).to_numpy()
+    price_chg = df['price_chg_pct'].fillna(0).to_numpy()
+
+    # Size of the move, scaled by each series' own volatility
+    oi_z = np.abs(oi_chg) / (np.std(oi_chg) or 1.0)
+    price_z = np.abs(price_chg) / (np.std(price_chg) or 1.0)
+    score = oi_z + 0.5 * price_z
+
+    # Regime boundaries: OI direction (accumulate / unwind / hold) differs from the previous week
+    direction = np.where(oi_chg > ACT_THRES, 1, np.where(oi_chg < -ACT_THRES, -1, 0))
+    boundary = np.r_[False, direction[1:] != direction[:-1]]
+    score = score + np.where(boundary, 1.0, 0.0)
+
+    # First and last week are always kept
+    score[0] = score[-1] = np.inf
+
+    keep = np.sort(np.argsort(-score, kind='stable')[:max_rows])
+    return df.iloc[keep]
+
+
+def encode_rows(rows_df: pd.DataFrame):
+    """Compact CSV encoding of the selected rows (much cheaper than one sentence per row)."""
+    lines = [HEADER]
+    dates = rows_df['Date'].dt.strftime('%Y-%m-%d')
+    for date, close, oi, oi_chg, price_chg in zip(
+        dates, rows_df['Close'], rows_df[OI_COL], rows_df['oi_chg_pct'], rows_df['price_chg_pct']
+    ):
+        oi_txt = "" if pd.isna(oi_chg) else f"{oi_chg:+.1f}"
+        price_txt = "" if pd.isna(price_chg) else f"{price_chg:+.1f}"
+        lines.append(f"{date},{close:.0f},{oi:.0f},{oi_txt},{price_txt}")
+    return "\n".join(lines)
@@ -0,0 +1,89 @@
+import datetime
+import pandas as pd
+from src.data_loader import DataLoader
+from src.analysis.backtester import Backtester
+from src.price_store import build_weekly_table, align_weekly
+from src.config import PRICE_ALIGNMENT
+from src import perf
+
+OI_COL = 'Lev_Money_Positions_Short_All'
+
+
+class SignalWatcher:
+    """
+    Incremental weekly signals for the watcher (watch_signals.py).
+    Only report weeks after an asset's last seen week are classified (Backtester.classify on the
+    week-over-week hedge fund short OI / price change). The stored last week is the baseline,
+    so history is never reloaded or recomputed; prices are fetched for a few weeks only.
+    """
+
+    @staticmethod
+    def _report_rows(asset_conf, year):
+        rows = DataLoader.download_and_read_cftc_year(year, asset_conf['cftc_name'])
+        if rows.empty:
+            return pd.DataFrame(columns=['Date', OI_COL])
+        return rows[['Date', OI_COL]].sort_values('Date').drop_duplicates(subset=['Date'], keep='last')
+
+    @staticmethod
+    @perf.timed("SignalWatcher.evaluate")
+    def evaluate(asset_name, asset_conf, last_seen=None, year=None):
+        """
+        Returns (signals, last_seen).
+        signals: [{asset, report_date, signal, pattern, oi_pct, price_pct, oi, close}] for each new week.
+        last_seen: {"date", "oi", "close"} of the newest week (baseline for the next run).
+        """
+        year = year or datetime.datetime.now().year
+        rows = SignalWatcher._report_rows(asset_conf, year)
+
+        if last_seen:
+            baseline = {"Date": pd.Timestamp(last_seen["date"]), OI_COL: last_seen["oi"], "Close": last_seen["close"]}
+            if baseline["Date"].year < year:
+                # The late-December report (out in early January) is in the previous year's file
+                rows = pd.concat([SignalWatcher._report_rows(asset_conf, year - 1), rows])
+            new_rows = rows[rows['Date'] > baseline["Date"]]
+        else:
+            # First run for this asset: the week before the latest one is the baseline
+            if len(rows) < 2:
+                rows = pd.concat([SignalWatcher._report_rows(asset_conf, year - 1).tail(2 - len(rows)), rows])
+            if len(rows) < 2:
+                return [], last_seen
+            baseline = None
+            new_rows = rows.tail(2)
+
+        if new_rows.empty:
+            return [], last_seen
+
+        # Same weekly price alignment as DataLoader.load_all_data, on a few weeks of prices
+        first_day = new_rows['Date'].min() - pd.Timedelta(days=7)
+        last_day = new_rows['Date'].max() + pd.Timedelta(days=7)
+        price_df = DataLoader.get_price_window(asset_conf['ticker'], first_day.strftime('%Y-%m-%d'), last_day.strftime('%Y-%m-%d'))
+        if price_df.empty:
+            return [], last_seen
+        weeks = align_weekly(new_rows, build_weekly_table(price_df.sort_index()), PRICE_ALIGNMENT).dropna(subset=['Close'])
+        if weeks.empty:
+            return [], last_seen
+
+        records = weeks[['Date', OI_COL, 'Close']].to_dict(orient='records')
+        if baseline is None:
+            baseline, records = records[0], records[1:]
+
+        signals = []
+        prev = baseline
+        for week in records:
+            oi_pct = (week[OI_COL] - prev[OI_COL]) / prev[OI_COL] * 100 if prev[OI_COL] else 0.0
+            price_pct = (week['Close'] - prev['Close']) / prev['Close'] * 100 if prev['Close'] else 0.0
+            signal, pattern = Backtester.classify(oi_pct, price_pct)
+            signals.append({
+                "asset": asset_name,
+                "report_date": week['Date'].strftime('%Y-%m-%d'),
+                "signal": signal,
+                "pattern": pattern,
+                "oi_pct": float(oi_pct),
+                "price_pct": float(price_pct),
+                "oi": float(week[OI_COL]),
+                "close": float(week['Close']),
+            })
+            prev = week
+
+        last_seen = {"date": prev['Date'].strftime('%Y-%m-%d'), "oi": float(prev[OI_COL]), "close": float(prev['Close'])}
+        return signals, last_seen
@@ -0,0 +1,194 @@
+from enum import IntEnum
+import numpy as np
+
+# Weekly OI change (%) that counts as an actual position change
+ACT_THRES = 2.0
+
+
+class MarketMode(IntEnum):
+    NEUTRAL = 0
+    HUNTER = 1
+    FARMER = 2
+
+
+class WeeklyPattern(IntEnum):
+    WAIT = 0
+    BEAR_RAID = 1
+    MOMENTUM_FARMING = 2
+    DIP_BUYING = 3
+    ACCUMULATION = 4
+    BOOK_CLOSING = 5
+    ROLLOVER = 6
+    LOOTING = 7
+    MISSION_ACCOMPLISHED = 8
+    END_HUNT = 9
+    HARVESTING = 10
+    SQUEEZE = 11
+    REDUCE = 12
+    EXIT = 13
+    SHORT_SQUEEZE = 14
+    DELEVERAGING = 15
+
+
+# pattern -> (emoji, title, desc, pred). desc may use {oi}/{price} (weekly % change).
+PATTERN_TEXT = {
+    WeeklyPattern.WAIT: ("😐", "관망 (Wait)",
+        "유의미한 포지션 변화가 없습니다. 기존 차익거래 포지션을 유지(Carry) 중입니다.",
+        "당분간 횡보하거나 현재 추세가 완만하게 이어질 것입니다."),
+    WeeklyPattern.BEAR_RAID: ("🩸", "공매도 공격 (Bear Raid)",
+        "현물 투매로 가격 폭락({price:.1f}%)을 유도하고, 선물 숏을 기습적으로 늘려(+{oi:.1f}%) **약탈적 사냥 모드**에 진입했습니다.",
+        "세력의 의도적인 하락 유도입니다. 바닥 신호가 나올 때까지 절대 진입하지 마세요."),
+    WeeklyPattern.MOMENTUM_FARMING: ("🌱", "이모작 시작 (Momentum Farming)",
+        "상승장에 맞추어 **무위험 차익거래(현물매수+선물매도) 농사**를 시작했습니다. (건전한 진입)",
+        "상승 모멘텀이 강화될 것입니다. 단기 과열 여부만 체크하세요."),
+    WeeklyPattern.DIP_BUYING: ("🐜", "저가 씨뿌리기 (Dip Buying)",
+        "가격 하락({price:.1f}%)을 기회로 삼아 **저렴한 값에 현물을 매집**하고 숏 포지션을 구축했습니다.",
+        "스마트 머니의 저가 매수세가 확인되었습니다. 물량 확보 후 반등 가능성이 높습니다."),
+    WeeklyPattern.ACCUMULATION: ("📦", "매집 축적 (Accumulation)",
+        "가격을 자극하지 않고 조용히 포지션을 늘리고 있습니다.",
+        "에너지가 응축되고 있습니다. 곧 시세 분출이 예상됩니다."),
+    WeeklyPattern.BOOK_CLOSING: ("💰", "연말 수익 확정 (Book Closing)",
+        "연말 보너스 확정을 위해 **1년 농사를 모두 수익 실현**하고 장부를 마감했습니다.",
+        "메이저 자금이 휴가를 떠났습니다. 산타 랠리(빈집털이) 혹은 횡보가 예상됩니다."),
+    WeeklyPattern.ROLLOVER: ("🔄", "분기 만기 롤오버 (Rollover)",
+        "만기를 앞두고 포지션을 교체하고 있습니다. 추세 변화가 아닌 **단순 교체 작업**입니다.",
+        "롤오버가 끝나면 기존 추세가 이어질 것입니다."),
+    WeeklyPattern.LOOTING: ("🍖", "전리품 챙기기 (Looting)",
+        "공매도 공격 성공 후, **하락장에서 막대한 수익을 실현(익절)**하고 있습니다.",
+        "세력이 배불리 먹고 있습니다. 매도 압력이 해소되면 기술적 반등이 올 것입니다."),
+    WeeklyPattern.MISSION_ACCOMPLISHED: ("😎", "작전 종료 (Mission Accomplished)",
+        "공격 목표 달성 후 남은 물량을 정리하며 유유히 시장을 떠나고 있습니다.",
+        "작전이 끝났습니다. 세력이 떠난 자리는 당분간 방향성 없는 움직임이 예상됩니다."),
+    WeeklyPattern.END_HUNT: ("📉", "사냥 종료 (End Hunt)",
+        "공격 포지션을 정리하고 있습니다.",
+        "변동성이 줄어들 것입니다."),
+    WeeklyPattern.HARVESTING: ("🌾", "가을 수확 (Harvesting)",
+        "기르던 포지션을 정리하며 **정상적인 차익거래 수익을 실현**하고 있습니다. (패닉 셀이 아님)",
+        "수익 실현 매물이 나오고 있습니다. 건전한 조정 과정입니다."),
+    WeeklyPattern.SQUEEZE: ("🔥", "흉작/스퀴즈 (Squeeze)",
+        "예상치 못한 급등으로 **농사가 실패하고 강제 청산(Stop Loss)** 당했습니다.",
+        "강제 청산 물량이 소진되면 급락할 위험이 있습니다."),
+    WeeklyPattern.REDUCE: ("📉", "포지션 축소 (Reduce)",
+        "리스크 관리를 위해 비중을 줄이고 있습니다.",
+        "관망세가 짙어질 것입니다."),
+    WeeklyPattern.EXIT: ("🏃", "이탈 (Exit)",
+        "시장 전망 악화로 시장을 떠나고 있습니다.",
+        "하락 추세가 지속될 수 있습니다."),
+    WeeklyPattern.SHORT_SQUEEZE: ("💸", "숏 스퀴즈 (Short Squeeze)",
+        "가격 급등으로 인한 강제 청산이 발생했습니다.",
+        "추격 매수를 자제하세요."),
+    WeeklyPattern.DELEVERAGING: ("📉", "비중 축소 (De-leveraging)",
+        "관망을 위해 포지션을 줄이고 있습니다.",
+        "횡보장이 예상됩니다."),
+}
+
+
+def classify_weeks(oi_pct, price_pct, months):
+    """
+    Weekly log logic tree (same as app.py's original engine). Sequential because the
+    market mode (HUNTER/FARMER) carries over into how later unwinds are read.
+    Returns (pattern codes, market mode after each week) as int8 arrays.
+    """
+    P = WeeklyPattern
+    patterns = np.zeros(len(oi_pct), dtype=np.int8)
+    modes = np.zeros(len(oi_pct), dtype=np.int8)
+    mode = MarketMode.NEUTRAL
+
+    for i, (oi, price, month) in enumerate(zip(oi_pct.tolist(), price_pct.tolist(), months.tolist())):
+        if oi > ACT_THRES:
+            if price < -3.0 and oi > 5.0:
+                mode, pattern = MarketMode.HUNTER, P.BEAR_RAID
+            elif price > 1.0:
+                mode, pattern = MarketMode.FARMER, P.MOMENTUM_FARMING
+            elif price < -1.0:
+                mode, pattern = MarketMode.FARMER, P.DIP_BUYING
+            else:
+                mode, pattern = MarketMode.FARMER, P.ACCUMULATION
+        elif oi < -ACT_THRES:
+            if month == 12:
+                mode, pattern = MarketMode.NEUTRAL, P.BOOK_CLOSING
+            elif month in (3, 6, 9):
+                pattern = P.ROLLOVER
+            elif mode == MarketMode.HUNTER:
+                pattern = P.LOOTING if price < -1.0 else P.MISSION_ACCOMPLISHED if price > 1.0 else P.END_HUNT
+            elif mode == MarketMode.FARMER:
+                pattern = P.HARVESTING if price < -1.0 else P.SQUEEZE if price > 1.0 else P.REDUCE
+            else:
+                pattern = P.EXIT if price < -1.0 else P.SHORT_SQUEEZE if price > 1.0 else P.DELEVERAGING
+        else:
+            mode, pattern = MarketMode.NEUTRAL, P.WAIT
+        patterns[i] = pattern
+        modes[i] = mode
+    return patterns, modes
+
+
+class WeeklyLogs:
+    """
+    Columnar weekly logs (newest first): date, OI/price weekly change (%), pattern and
+    market mode codes. Localized text is only built by render() for the rows shown.
+    """
+
+    def __init__(self, dates, oi_delta, price_delta, pattern, market_mode):
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+        self.oi_delta = np.asarray(oi_delta, dtype=float)
+        self.price_delta = np.asarray(price_delta, dtype=float)
+        self.pattern = np.asarray(pattern, dtype=np.int8)
+        self.market_mode = np.asarray(market_mode, dtype=np.int8)
+
+    @staticmethod
+    def build(dates, oi, price):
+        """dates/oi/price: weekly rows in ascending date order (one row per date)."""
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        oi = np.asarray(oi, dtype=float)
+        price = np.asarray(price, dtype=float)
+        if len(dates) < 2:
+            return WeeklyLogs.empty()
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            oi_pct = np.where(oi[:-1] != 0, (oi[1:] - oi[:-1]) / oi[:-1] * 100, 0.0)
+            price_pct = np.where(price[:-1] != 0, (price[1:] - price[:-1]) / price[:-1] * 100, 0.0)
+        months = dates[1:].astype("datetime64[M]").astype(int) % 12 + 1
+        patterns, modes = classify_weeks(oi_pct, price_pct, months)
+        return WeeklyLogs(dates[1:][::-1], oi_pct[::-1], price_pct[::-1], patterns[::-1], modes[::-1])
+
+    @staticmethod
+    def empty():
+        return WeeklyLogs([], [], [], [], [])
+
+    def __len__(self):
+        return len(self.dates)
+
+    def render(self, limit=None):
+        """Display rows (newest first, up to `limit`): date, oi_delta, price_delta, emoji, title, desc, pred."""
+        rows = []
+        for i in range(len(self) if limit is None else min(limit, len(self))):
+            oi, price = float(self.oi_delta[i]), float(self.price_delta[i])
+            emoji, title, desc, pred = PATTERN_TEXT[WeeklyPattern(self.pattern[i])]
+            rows.append({
+                "date": str(self.dates[i]),
+                "oi_delta": oi,
+                "price_delta": price,
+                "emoji": emoji,
+                "title": title,
+                "desc": desc.format(oi=oi, price=price),
+                "pred": pred,
+            })
+        return rows
+
+    def to_columns(self):
+        """JSON-friendly columns (codes as enum names), e.g. for the API and snapshots."""
+        return {
+            "date": np.datetime_as_string(self.dates, unit="D").tolist(),
+            "oi_delta": self.oi_delta.tolist(),
+            "price_delta": self.price_delta.tolist(),
+            "pattern": [WeeklyPattern(p).name for p in self.pattern.tolist()],
+            "market_mode": [MarketMode(m).name for m in self.market_mode.tolist()],
+        }
+
+    @staticmethod
+    def from_columns(columns):
+        return WeeklyLogs(
+            columns["date"], columns["oi_delta"], columns["price_delta"],
+            [WeeklyPattern[p] for p in columns["pattern"]],
+            [MarketMode[m] for m in columns["market_mode"]],
+        )
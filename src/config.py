@@ -1,22 +1,13 @@
+import os
+import json
 
-# 자산 설정 (Asset Configuration)
-ASSET_CONFIG = {
-    "Bitcoin (BTC)": {
-        "ticker": "BTC-USD",
-        "cftc_name": "BITCOIN",
-        "multiplier": 5, # CME BTC Contract Multiplier
-        "color": "orange"
-    },
-    "Ethereum (ETH)": {
-        "ticker": "ETH-USD",
-        "cftc_name": "ETHER",
-        "multiplier": 50, # CME ETH Contract Multiplier
-        "color": "purple"
-    }
-}
+# 기본 화면 설정 (사이드바 시작 연도 / 타임머신 기본 구간)
+DEFAULT_START_YEAR = 2023
+DEFAULT_ANALYSIS_WEEKS = 12
 
 # CFTC 리포트 URL 템플릿
-CFTC_URL_TEMPLATE = "https://www.cftc.gov/files/dea/history/fut_fin_txt_{year}.zip"
+# (환경변수로 교체 가능: 오프라인 벤치마크용 로컬 서버 등)
+CFTC_URL_TEMPLATE = os.environ.get("CFTC_URL_TEMPLATE", "https://www.cftc.gov/files/dea/history/fut_fin_txt_{year}.zip")
 
 # 추출할 컬럼 목록
 COLS_WE_NEED = [
@@ -30,5 +21,138 @@ COLS_WE_NEED = [
     "Non-Rept_Positions_Short_All"
 ]
 
+# TFF 트레이더 분류 (컬럼 접두어 -> 표시 이름), 파생 포지션 지표 계산 대상
+TRADER_CATEGORIES = {
+    "Dealer": "Dealers",
+    "Asset_Mgr": "Asset Managers",
+    "Lev_Money": "Hedge Funds",
+    "Other_Rept": "Other Reportables",
+    "NonRept": "Non-Reportables",
+}
+COT_INDEX_WEEKS = 52 # COT index / z-score 롤링 윈도우 (주)
+
 # 캐시 디렉토리
-CACHE_DIR = "data_cache"
+CACHE_DIR = os.environ.get("CFTC_CACHE_DIR", "data_cache")
+
+# CFTC 다운로드 (스트리밍 + Range 이어받기 + 재시도) / 캐시 무결성 매니페스트
+CFTC_DOWNLOAD_TIMEOUT = (10, 60) # (connect, read) seconds
+CFTC_DOWNLOAD_RETRIES = 3
+CFTC_DOWNLOAD_BACKOFF = 1.0 # seconds, doubled per retry (+ jitter)
+CACHE_MANIFEST_FILE = os.path.join(CACHE_DIR, "manifest.json")
+
+# 비동기 ingest 파이프라인 (CFTC 연도별 다운로드/파싱 + 가격 조회를 동시에)
+INGEST_MAX_CONCURRENCY = int(os.environ.get("INGEST_MAX_CONCURRENCY", 4)) # concurrent fetch/parse jobs
+INGEST_TIMEOUT = 300 # seconds, whole load (pending jobs are cancelled)
+
+# 당해 연도 TFF 파일 메모리 캐시 유효 시간 (지난 연도는 프로세스 내내 재사용)
+CURRENT_YEAR_TTL = 3600 # seconds
+
+# 로드된 데이터 번들 (주간 병합 + 일간 가격) 메모리 캐시: stale-while-revalidate
+# 이 시간이 지나면 기존 번들을 계속 보여주면서 백그라운드에서 당해 연도 CFTC/가격 꼬리를 재확인 후 교체
+BUNDLE_REFRESH_INTERVAL = 3600 # seconds
+BUNDLE_CACHE_MAX_ENTRIES = 64
+
+# 가격 저장소 (티커별 일봉 + 리포트 주간 정렬 테이블)
+PRICE_CACHE_DIR = os.path.join(CACHE_DIR, "prices")
+PRICE_CACHE_TTL = 3600 # 최근 구간 재조회 주기 (seconds)
+
+# CFTC 주간 행에 붙일 가격 (look-ahead 없는 정렬 정책)
+#   "asof"      : 포지션 기준일(화요일) 종가
+#   "release"   : 발표일(금요일) 종가
+#   "next_open" : 발표 이후 첫 거래일 시가 (실제로 진입 가능한 가격)
+PRICE_ALIGNMENT = os.environ.get("PRICE_ALIGNMENT", "asof")
+
+# 마켓 메타데이터 (TFF 마켓 이름 " - " 앞부분 -> 표시 이름/가격 티커/계약 승수/차트 색상)
+# 실제 자산 목록(ASSET_CONFIG)은 다운로드한 TFF 파일의 마켓 카탈로그에 있는 것만 이 순서대로 생성됩니다.
+MARKET_METADATA = {
+    # Crypto
+    "BITCOIN": {"name": "Bitcoin (BTC)", "symbol": "BTC", "ticker": "BTC-USD", "multiplier": 5, "color": "orange"},
+    "ETHER CASH SETTLED": {"name": "Ethereum (ETH)", "symbol": "ETH", "ticker": "ETH-USD", "multiplier": 50, "color": "purple"},
+    "MICRO BITCOIN": {"name": "Micro Bitcoin (MBT)", "symbol": "MBT", "ticker": "BTC-USD", "multiplier": 0.1, "color": "darkorange"},
+    "MICRO ETHER": {"name": "Micro Ether (MET)", "symbol": "MET", "ticker": "ETH-USD", "multiplier": 0.1, "color": "mediumpurple"},
+    # Equity index
+    "E-MINI S&P 500": {"name": "E-mini S&P 500 (ES)", "symbol": "ES", "ticker": "ES=F", "multiplier": 50, "color": "steelblue"},
+    "MICRO E-MINI S&P 500 INDEX": {"name": "Micro E-mini S&P 500 (MES)", "symbol": "MES", "ticker": "MES=F", "multiplier": 5, "color": "lightsteelblue"},
+    "NASDAQ MINI": {"name": "E-mini Nasdaq-100 (NQ)", "symbol": "NQ", "ticker": "NQ=F", "multiplier": 20, "color": "teal"},
+    "MICRO E-MINI NASDAQ-100 INDEX": {"name": "Micro E-mini Nasdaq-100 (MNQ)", "symbol": "MNQ", "ticker": "MNQ=F", "multiplier": 2, "color": "mediumaquamarine"},
+    "RUSSELL E-MINI": {"name": "E-mini Russell 2000 (RTY)", "symbol": "RTY", "ticker": "RTY=F", "multiplier": 50, "color": "olive"},
+    "DJIA x $5": {"name": "E-mini Dow (YM)", "symbol": "YM", "ticker": "YM=F", "multiplier": 5, "color": "navy"},
+    "VIX FUTURES": {"name": "VIX Futures (VX)", "symbol": "VX", "ticker": "^VIX", "multiplier": 1000, "color": "crimson"},
+    # Rates / FX
+    "UST 10Y NOTE": {"name": "10-Year T-Note (ZN)", "symbol": "ZN", "ticker": "ZN=F", "multiplier": 1000, "color": "darkgreen"},
+    "UST 2Y NOTE": {"name": "2-Year T-Note (ZT)", "symbol": "ZT", "ticker": "ZT=F", "multiplier": 2000, "color": "seagreen"},
+    "EURO FX": {"name": "Euro FX (6E)", "symbol": "6E", "ticker": "6E=F", "multiplier": 125000, "color": "royalblue"},
+    "JAPANESE YEN": {"name": "Japanese Yen (6J)", "symbol": "6J", "ticker": "6J=F", "multiplier": 12500000, "color": "firebrick"},
+    "BRITISH POUND": {"name": "British Pound (6B)", "symbol": "6B", "ticker": "6B=F", "multiplier": 62500, "color": "slateblue"},
+}
+
+# 마지막으로 파싱한 TFF 파일의 마켓 목록 (DataLoader가 갱신)
+MARKET_CATALOG_FILE = os.path.join(CACHE_DIR, "market_catalog.json")
+
+# 카탈로그가 아직 없을 때 (첫 실행) 사용할 마켓
+DEFAULT_MARKETS = ["BITCOIN", "ETHER CASH SETTLED"]
+
+
+def build_asset_config(market_keys):
+    """{display name: {ticker, cftc_name, multiplier, color, symbol}} for the known markets, in MARKET_METADATA order."""
+    present = set(market_keys)
+    return {
+        meta["name"]: {
+            "ticker": meta["ticker"],
+            "cftc_name": key, # exact TFF market name (before " - EXCHANGE")
+            "multiplier": meta["multiplier"],
+            "color": meta["color"],
+            "symbol": meta["symbol"],
+        }
+        for key, meta in MARKET_METADATA.items()
+        if key in present
+    }
+
+
+def load_market_catalog():
+    try:
+        with open(MARKET_CATALOG_FILE, encoding="utf-8") as f:
+            return json.load(f).get("markets", [])
+    except (OSError, ValueError):
+        return []
+
+
+# 자산 설정 (Asset Configuration) - 마켓 카탈로그에서 생성
+ASSET_CONFIG = build_asset_config(load_market_catalog()) or build_asset_config(DEFAULT_MARKETS)
+
+# AI 내러티브 디스크 캐시 (동일 데이터/프롬프트 재요청 시 즉시 응답)
+NARRATIVE_CACHE_DIR = os.path.join(CACHE_DIR, "narratives")
+NARRATIVE_CACHE_TTL = 3600 * 24 * 7 # 7 days
+NARRATIVE_CACHE_MAX_BYTES = 20 * 1024 * 1024 # 20 MB
+
+# AI 내러티브 백엔드 ("gemini" 또는 오프라인 부하 테스트용 "replay")
+NARRATOR_BACKEND = os.environ.get("NARRATOR_BACKEND", "gemini")
+NARRATOR_MODEL = "gemini-2.0-flash-exp"
+NARRATOR_TIMEOUT = float(os.environ.get("NARRATOR_TIMEOUT", 60)) # seconds per call (deadline)
+NARRATOR_MAX_CONCURRENCY = int(os.environ.get("NARRATOR_MAX_CONCURRENCY", 4)) # concurrent LLM calls per process
+NARRATOR_MAX_RETRIES = int(os.environ.get("NARRATOR_MAX_RETRIES", 2))
+NARRATOR_REPLAY_LATENCY = float(os.environ.get("NARRATOR_REPLAY_LATENCY", 0.5)) # seconds (replay backend)
+
+# 기본 화면 스냅샷 (자산별 최신 분석 결과 + 차트 JSON)
+SNAPSHOT_DIR = os.path.join(CACHE_DIR, "snapshots")
+SNAPSHOT_RECHECK_INTERVAL = 3600 # 발표 예정 시각 이후 새 리포트 재확인 주기 (seconds)
+
+# Headless JSON API (api.py)
+API_CACHE_TTL = 60 * 15 # in-process response cache (seconds)
+API_CACHE_MAX_ENTRIES = 256
+API_MAX_AGE = 60 * 15 # Cache-Control max-age for clients/CDNs (seconds)
+
+# 크로스 마켓 패널 (Cross-Asset)
+PANEL_DEFAULT_WINDOW = 26 # rolling correlation window (weeks)
+PANEL_DEFAULT_MAX_LAG = 4 # lead/lag range (+/- weeks)
+
+# 시그널 감시 / 알림 (watch_signals.py)
+# ALERT_SINKS: 쉼표로 구분된 sink 목록 ("file:<path>", "webhook:<url>", "stdout", "memory")
+ALERT_SINKS = os.environ.get("ALERT_SINKS", f"file:{os.path.join(CACHE_DIR, 'alerts.jsonl')},stdout")
+ALERT_WEBHOOK_TIMEOUT = 10 # seconds
+WATCHER_STATE_FILE = os.path.join(CACHE_DIR, "watcher_state.json")
+
+# Arrow/Parquet 분석 패널 export (노트북/다운스트림용, load_all_data 캐시 빌드의 부산물)
+# EXPORT_FORMATS: 쉼표로 구분 ("arrow", "parquet"), 빈 문자열이면 export 안 함. pyarrow 필요 (없으면 건너뜀)
+EXPORT_DIR = os.environ.get("CFTC_EXPORT_DIR", os.path.join(CACHE_DIR, "exports"))
+EXPORT_FORMATS = [f.strip() for f in os.environ.get("EXPORT_FORMATS", "arrow,parquet").split(",") if f.strip()]
@@ -1,58 +1,181 @@
 
 import os
-import io
+import json
+import time
 import datetime
+import shutil
+import threading
 import zipfile
-import requests
+import numpy as np
 import pandas as pd
-import yfinance as yf
-import streamlit as st
-from src.config import ASSET_CONFIG, CFTC_URL_TEMPLATE, COLS_WE_NEED, CACHE_DIR
+from src.config import ASSET_CONFIG, CFTC_URL_TEMPLATE, COLS_WE_NEED, CACHE_DIR, CURRENT_YEAR_TTL, BUNDLE_REFRESH_INTERVAL, BUNDLE_CACHE_MAX_ENTRIES, MARKET_CATALOG_FILE, MARKET_METADATA, PRICE_ALIGNMENT
+from src.timeseries import index_by_date
+from src.analysis.positioning import Positioning
+from src.price_store import PriceStore, align_weekly
+from src.downloads import CacheManifest, NotModified, download_file
+from src.export import PanelExporter
+from src.ingest import run_ingest
+from src.singleflight import SingleFlight
+from src.refresher import BackgroundRefresher, StaleWhileRevalidateCache, revalidating
+from src import perf, memprofile
 
 class DataLoader:
+    # Injectable price source: fn(ticker, start_date, end_date) -> daily OHLC DataFrame.
+    # None = yfinance. Benchmarks/offline runs plug in synthetic prices here.
+    price_fetcher = None
+
     @staticmethod
     def ensure_cache_dir():
-        if not os.path.exists(CACHE_DIR):
-            os.makedirs(CACHE_DIR)
+        os.makedirs(CACHE_DIR, exist_ok=True) # exist_ok: concurrent year loads
+
+    # Shared per-year TFF frames (all markets): {year: (loaded_at, df, market_index)}
+    # Every asset is sliced out of these, so adding markets doesn't add downloads/parses.
+    _year_frames = {}
+    _year_lock = threading.Lock()
+    _revalidate_years = set() # Past years whose next load re-checks the server (see invalidate_year)
+    _catalog_lock = threading.Lock() # Year loads run concurrently (src/ingest.py)
+    # Concurrent identical loads (e.g. every session right after a release) share one download/parse/fetch
+    _year_flight = SingleFlight("cftc.year")
+    _price_flight = SingleFlight("price.fetch")
+    # Expired current-year frames are served while they reload in the background
+    _year_refresher = BackgroundRefresher("cftc.year")
+    # Loaded (combined, price) bundles, stale-while-revalidate (see load_bundle)
+    _bundles = StaleWhileRevalidateCache(
+        "bundle", BUNDLE_REFRESH_INTERVAL, BUNDLE_CACHE_MAX_ENTRIES, valid=lambda bundle: not bundle[0].empty,
+    )
 
     @staticmethod
-    def download_and_read_cftc_year(year, asset_name="BITCOIN"):
-        """Downloads zip for a year, extracts txt, and returns DataFrame."""
+    def clear_year_cache():
+        with DataLoader._year_lock:
+            DataLoader._year_frames.clear()
+
+    @staticmethod
+    def invalidate_year(year, revalidate=False):
+        """
+        Drops one year's in-memory frame (next read re-downloads/re-reads it).
+        revalidate=True: a past year's disk cache is also re-checked with a conditional GET on that
+        read (normally only the current year is; the late-December report lands in January).
+        """
+        with DataLoader._year_lock:
+            DataLoader._year_frames.pop(year, None)
+            if revalidate:
+                DataLoader._revalidate_years.add(year)
+
+    @staticmethod
+    def remote_year_version(year, timeout=30):
+        """
+        Cheap change check for a year's zip: HEAD request -> {"etag", "last_modified", "length"}.
+        Returns None if the server can't be reached.
+        """
+        import requests  # Lazy import
+
+        try:
+            r = requests.head(CFTC_URL_TEMPLATE.format(year=year), timeout=timeout, allow_redirects=True)
+            r.raise_for_status()
+        except Exception as e:
+            print(f"Version check failed for {year}: {e}")
+            return None
+        return {
+            "etag": r.headers.get("ETag"),
+            "last_modified": r.headers.get("Last-Modified"),
+            "length": r.headers.get("Content-Length"),
+        }
+
+    @staticmethod
+    def market_key(market_name):
+        """'BITCOIN - CHICAGO MERCANTILE EXCHANGE' -> 'BITCOIN'"""
+        return str(market_name).split(" - ", 1)[0].strip()
+
+    @staticmethod
+    def build_market_index(market_names):
+        """{market key: row positions}. Keys are derived per unique name (a few hundred), not per row."""
+        name_codes, names = pd.factorize(market_names)
+        key_codes, keys = pd.factorize(pd.Series([DataLoader.market_key(name) for name in names], dtype=object))
+        rows = np.flatnonzero(name_codes >= 0)
+        groups = pd.Series(rows).groupby(key_codes[name_codes[rows]]).indices
+        return {keys[k]: rows[pos] for k, pos in groups.items()}
+
+    @staticmethod
+    def read_cftc_year(year):
+        """
+        Full TFF frame for a year (all markets, Date parsed) and {market key: row positions}.
+        Kept in memory: past years for the process lifetime, the current year for CURRENT_YEAR_TTL.
+        After that the expired frame is still returned while it reloads in the background
+        (background refreshes themselves wait for the reload). invalidate_year() forces a reload.
+        Returns (empty DataFrame, {}) if the year could not be loaded.
+        """
+        current_year = datetime.datetime.now().year
+        with DataLoader._year_lock:
+            entry = DataLoader._year_frames.get(year)
+        if entry is not None and (year < current_year or time.time() - entry[0] < CURRENT_YEAR_TTL):
+            return entry[1], entry[2]
+        if entry is not None and not revalidating():
+            DataLoader._year_refresher.submit(year, DataLoader._year_flight.do, year, DataLoader._load_year, year)
+            return entry[1], entry[2]
+        return DataLoader._year_flight.do(year, DataLoader._load_year, year)
+
+    @staticmethod
+    def _load_year(year):
+        """read_cftc_year's miss path: load + index the year and store it in memory."""
+        df = DataLoader._load_cftc_year_file(year)
+        if df.empty:
+            return df, {}
+
+        with perf.span("cftc.index", year=year), memprofile.stage("cftc.index", year=year):
+            market_index = DataLoader.build_market_index(df['Market_and_Exchange_Names'])
+
+        with DataLoader._year_lock:
+            DataLoader._year_frames[year] = (time.time(), df, market_index)
+        DataLoader.update_market_catalog(year, list(market_index))
+        return df, market_index
+
+    @staticmethod
+    def _load_cftc_year_file(year):
+        """
+        Returns a year's full TFF DataFrame from the disk cache, (re)downloading when needed.
+        The cached txt is only trusted if it matches its manifest checksum; the current year
+        is revalidated with a conditional GET so an unchanged file isn't downloaded again
+        (past years too after invalidate_year(year, revalidate=True)).
+        """
         DataLoader.ensure_cache_dir()
-        
-        # Check cache
-        cache_file = os.path.join(CACHE_DIR, f"fin_fut_txt_{year}.txt")
+
+        cache_name = f"fin_fut_txt_{year}.txt"
+        cache_file = os.path.join(CACHE_DIR, cache_name)
         current_year = datetime.datetime.now().year
-        
-        df = None
-        
-        # Load from cache if possible (skip re-download for past years)
-        if os.path.exists(cache_file) and year < current_year:
+        with DataLoader._year_lock:
+            revalidate = year >= current_year or year in DataLoader._revalidate_years
+            DataLoader._revalidate_years.discard(year)
+        manifest = CacheManifest()
+
+        with perf.span("cftc.verify", year=year):
+            cache_ok = manifest.verify(cache_name, cache_file)
+        if os.path.exists(cache_file) and not cache_ok:
+            print(f"Cache for {year} is missing from the manifest or corrupt; re-downloading")
+
+        cache = "hit"
+        if cache_ok and revalidate:
             try:
-                df = pd.read_csv(cache_file, low_memory=False)
+                DataLoader._download_cftc_year(year, cache_file, manifest, conditional=manifest.get(cache_name))
+                cache = "miss"
+            except NotModified:
+                pass
             except Exception as e:
-                print(f"Error reading cache for {year}: {e}")
-
-        # Download if needed
-        if df is None:
-            print(f"Downloading data for {year}...")
-            url = CFTC_URL_TEMPLATE.format(year=year)
+                print(f"Failed to refresh {year}, using cached copy: {e}")
+        elif not cache_ok:
+            cache = "miss"
             try:
-                r = requests.get(url)
-                r.raise_for_status()
-                
-                with zipfile.ZipFile(io.BytesIO(r.content)) as z:
-                    file_names = z.namelist()
-                    txt_file = [f for f in file_names if f.endswith('.txt')][0]
-                    
-                    with z.open(txt_file) as f:
-                        df = pd.read_csv(f, low_memory=False)
-                        df.to_csv(cache_file, index=False)
-                        
+                DataLoader._download_cftc_year(year, cache_file, manifest)
             except Exception as e:
                 print(f"Failed to download or parse {year}: {e}")
                 return pd.DataFrame()
 
+        try:
+            with perf.span("cftc.parse", year=year, cache=cache), memprofile.stage("cftc.cache_read", year=year):
+                df = pd.read_csv(cache_file, low_memory=False)
+        except Exception as e:
+            print(f"Error reading cache for {year}: {e}")
+            return pd.DataFrame()
+
         # Preprocessing
         df.columns = df.columns.str.strip()
         
@@ -60,22 +183,107 @@ class DataLoader:
         market_col = [c for c in df.columns if 'Market' in c and 'Exchange' in c]
         if not market_col:
             return pd.DataFrame()
-        market_col = market_col[0]
-
-        # Filter by Asset Name
-        target_df = df[df[market_col].str.contains(asset_name, na=False)].copy()
         
-        if target_df.empty:
-            return pd.DataFrame()
-
         # Find Date Column
         date_col = [c for c in df.columns if 'Report_Date' in c]
         if not date_col:
             return pd.DataFrame()
-        date_col = date_col[0]
         
-        # Parse Date
-        target_df['Date'] = pd.to_datetime(target_df[date_col])
+        # Normalize names + parse dates once per year (shared by every asset)
+        if market_col[0] != 'Market_and_Exchange_Names':
+            df = df.rename(columns={market_col[0]: 'Market_and_Exchange_Names'})
+        df['Date'] = pd.to_datetime(df[date_col[0]])
+        return df
+
+    @staticmethod
+    def _download_cftc_year(year, cache_file, manifest, conditional=None):
+        """
+        Streams the year's zip to disk (resumable, retried), checks its CRCs, and extracts the txt
+        into cache_file atomically, recording the checksum in the manifest.
+        Raises NotModified when the conditional request says the cached copy is current.
+        """
+        print(f"{'Revalidating' if conditional else 'Downloading'} data for {year}...")
+        url = CFTC_URL_TEMPLATE.format(year=year)
+        zip_path = os.path.join(CACHE_DIR, f"fin_fut_txt_{year}.zip")
+
+        for attempt in range(2):
+            with perf.span("cftc.download", year=year, cache="miss"), memprofile.stage("cftc.download", year=year):
+                info = download_file(url, zip_path, conditional=conditional)
+            try:
+                with zipfile.ZipFile(zip_path) as z:
+                    bad = z.testzip()
+                if bad is None:
+                    break
+                error = f"CRC mismatch in {bad}"
+            except zipfile.BadZipFile as e:
+                error = str(e)
+            os.remove(zip_path)
+            if attempt:
+                raise IOError(f"Corrupt archive for {year}: {error}")
+            print(f"Corrupt archive for {year} ({error}); downloading again")
+            conditional = None
+
+        # Extract raw bytes (no parse/re-serialize) -> tmp -> rename, so readers never see a half-written cache
+        tmp_path = f"{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with memprofile.stage("cftc.extract", year=year), zipfile.ZipFile(zip_path) as z:
+            txt_file = [f for f in z.namelist() if f.endswith('.txt')][0]
+            with z.open(txt_file) as src, open(tmp_path, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+        os.replace(tmp_path, cache_file)
+        manifest.record(
+            os.path.basename(cache_file), cache_file,
+            source=url, source_size=info["size"], etag=info["etag"], last_modified=info["last_modified"],
+        )
+        os.remove(zip_path)
+
+    @staticmethod
+    def latest_report_date(year=None):
+        """Latest report date (YYYY-MM-DD) in a year's file (all markets share it), or None."""
+        df, _ = DataLoader.read_cftc_year(year or datetime.datetime.now().year)
+        return df['Date'].max().strftime('%Y-%m-%d') if not df.empty else None
+
+    @staticmethod
+    def update_market_catalog(year, market_keys):
+        """Records the markets of the latest loaded year (ASSET_CONFIG is generated from it on startup)."""
+        with DataLoader._catalog_lock:
+            try:
+                with open(MARKET_CATALOG_FILE, encoding="utf-8") as f:
+                    catalog = json.load(f)
+            except (OSError, ValueError):
+                catalog = {}
+            # Only newer (or changed same-year) catalogs replace the stored one
+            if year < catalog.get("year", 0):
+                return
+            if year == catalog.get("year") and sorted(market_keys) == catalog.get("markets"):
+                return
+
+            DataLoader.ensure_cache_dir()
+            tmp_path = f"{MARKET_CATALOG_FILE}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"year": year, "markets": sorted(market_keys)}, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, MARKET_CATALOG_FILE)
+
+    @staticmethod
+    def download_and_read_cftc_year(year, asset_name="BITCOIN"):
+        """Returns one market's rows for a year, sliced from the shared year frame."""
+        df, market_index = DataLoader.read_cftc_year(year)
+        if df.empty:
+            return pd.DataFrame()
+
+        # Filter by Asset Name (exact market key; substring match as a fallback for free-form names).
+        # Catalog markets (MARKET_METADATA keys) are exact only: a year without the key has no rows,
+        # a substring match would pull in sibling contracts ("MICRO BITCOIN" for "BITCOIN").
+        with perf.span("cftc.filter", year=year, asset=asset_name), memprofile.stage("cftc.filter", year=year):
+            positions = market_index.get(asset_name)
+            if positions is not None:
+                target_df = df.iloc[positions].copy()
+            elif asset_name in MARKET_METADATA:
+                return pd.DataFrame()
+            else:
+                target_df = df[df['Market_and_Exchange_Names'].str.contains(asset_name, na=False, regex=False)].copy()
+        
+        if target_df.empty:
+            return pd.DataFrame()
         
         return target_df
 
@@ -83,24 +291,42 @@ class DataLoader:
     def get_cftc_data(start_year, end_year, asset_name):
         all_dfs = []
         for y in range(start_year, end_year + 1):
-            df = DataLoader.download_and_read_cftc_year(y, asset_name)
-            if not df.empty:
-                all_dfs.append(df)
-                
+            with memprofile.stage("cftc.year", year=y):
+                all_dfs.append(DataLoader.download_and_read_cftc_year(y, asset_name))
+        return DataLoader.combine_cftc_years(all_dfs)
+
+    @staticmethod
+    def combine_cftc_years(year_dfs):
+        """One asset's per-year frames -> a single frame sorted by Date (one row per report)."""
+        all_dfs = [df for df in year_dfs if not df.empty]
         if not all_dfs:
             return pd.DataFrame()
             
-        final_df = pd.concat(all_dfs)
+        with perf.span("cftc.concat"), memprofile.stage("cftc.concat"):
+            final_df = pd.concat(all_dfs)
         final_df = final_df.sort_values('Date').drop_duplicates(subset=['Date'], keep='last')
         return final_df
 
     @staticmethod
     def get_price_data(ticker, start_year, end_year):
-        start_date = f"{start_year}-01-01"
-        end_date = f"{end_year}-12-31"
-        
-        ticker_obj = yf.Ticker(ticker)
-        price_df = ticker_obj.history(start=start_date, end=end_date)
+        """Daily prices for whole years via the on-disk PriceStore (only missing ranges are fetched)."""
+        return PriceStore.get(ticker, f"{start_year}-01-01", f"{end_year}-12-31", fetch=DataLoader.get_price_window)
+
+    @staticmethod
+    def get_price_window(ticker, start_date, end_date):
+        """Daily prices between two dates ('YYYY-MM-DD'), tz-naive index. Identical concurrent requests share one fetch."""
+        return DataLoader._price_flight.do((ticker, start_date, end_date), DataLoader._fetch_price_window, ticker, start_date, end_date)
+
+    @staticmethod
+    def _fetch_price_window(ticker, start_date, end_date):
+        if DataLoader.price_fetcher is not None:
+            with perf.span("price.fetch", ticker=ticker):
+                price_df = DataLoader.price_fetcher(ticker, start_date, end_date)
+        else:
+            import yfinance as yf  # Lazy import (heavy, only needed when fetching prices)
+            ticker_obj = yf.Ticker(ticker)
+            with perf.span("price.yfinance", ticker=ticker):
+                price_df = ticker_obj.history(start=start_date, end=end_date)
         
         if not price_df.empty:
              # Remove timezone info for compatibility
@@ -109,29 +335,81 @@ class DataLoader:
         return price_df
 
     @staticmethod
-    @st.cache_data(ttl=3600*12) # Cache for 12 hours
-    def load_all_data(start_year, end_year, asset_conf):
-        """Loads and merges CFTC and Price data."""
-        
-        # 1. Load CFTC
-        cftc_df = DataLoader.get_cftc_data(start_year, end_year, asset_conf['cftc_name'])
-        
-        # 2. Load Price
-        price_df = DataLoader.get_price_data(asset_conf['ticker'], start_year, end_year)
+    def load_all_data(start_year, end_year, asset_conf, alignment=PRICE_ALIGNMENT):
+        """Merged weekly CFTC + price frame (see load_bundle)."""
+        return DataLoader.load_bundle(start_year, end_year, asset_conf, alignment)[0]
+
+    @staticmethod
+    def bundle_key(start_year, end_year, asset_conf, alignment=PRICE_ALIGNMENT):
+        return (start_year, end_year, tuple(sorted(asset_conf.items())), alignment)
+
+    @staticmethod
+    def load_bundle(start_year, end_year, asset_conf, alignment=PRICE_ALIGNMENT):
+        """
+        (combined weekly frame, daily price frame) from the in-process bundle cache; both are
+        empty if either source failed. Once loaded, a bundle is served immediately even when
+        it is older than BUNDLE_REFRESH_INTERVAL - a background thread then rebuilds it from
+        revalidated sources and swaps it in (src/refresher.py). Callers get their own copies.
+        """
+        key = DataLoader.bundle_key(start_year, end_year, asset_conf, alignment)
+        combined, price_df = DataLoader._bundles.get(key, DataLoader.build_bundle, start_year, end_year, asset_conf, alignment)
+        return combined.copy(), price_df.copy()
+
+    @staticmethod
+    def bundle_status(start_year, end_year, asset_conf, alignment=PRICE_ALIGNMENT):
+        """As-of info of a cached bundle: {"report_date", "price_date", "loaded_at", "refreshing"}, or None."""
+        status = DataLoader._bundles.status(DataLoader.bundle_key(start_year, end_year, asset_conf, alignment))
+        if status is None:
+            return None
+        combined, price_df = status["value"]
+        return {
+            "report_date": combined.index[-1].strftime('%Y-%m-%d'),
+            "price_date": price_df.index[-1].strftime('%Y-%m-%d'),
+            "loaded_at": datetime.datetime.fromtimestamp(status["built_at"]),
+            "refreshing": status["refreshing"],
+        }
+
+    @staticmethod
+    def clear_bundle_cache():
+        DataLoader._bundles.clear()
+
+    @staticmethod
+    @memprofile.profiled("load_all_data")
+    def build_bundle(start_year, end_year, asset_conf, alignment=PRICE_ALIGNMENT):
+        """
+        Loads and merges CFTC and Price data (uncached, see load_bundle).
+        alignment: which weekly price becomes 'Close' ("asof" / "release" / "next_open", see config);
+        all three are attached as Price_* columns.
+        """
+        # 1+2. CFTC years and prices fetched/parsed concurrently (src/ingest.py)
+        try:
+            cftc_df, price_df = run_ingest(start_year, end_year, asset_conf)
+        except Exception as e: # ingest timeout or a failed fetch -> same empty result as other load failures
+            print(f"Failed to load data for {asset_conf.get('symbol')} ({start_year}-{end_year}): {e!r}")
+            return pd.DataFrame(), pd.DataFrame()
         
         if cftc_df.empty or price_df.empty:
-            return pd.DataFrame() # Return empty if fail
+            return pd.DataFrame(), pd.DataFrame() # Return empty if fail
 
-        # 3. Merge (AsOf Merge for Weekly CFTC + Daily Price)
+        # 3. Merge: keyed lookup into the store's precomputed alignment table
+        # (release-aware, never a price from after the chosen point in time)
         cftc_df = cftc_df.sort_values('Date')
         
-        # Use 'Close' price
-        combined = pd.merge_asof(
-            cftc_df, 
-            price_df['Close'], 
-            left_on='Date', 
-            right_index=True, 
-            direction='nearest'
-        )
+        with perf.span("price.align", policy=alignment), memprofile.stage("price.align"):
+            combined = align_weekly(cftc_df, PriceStore.weekly_table(asset_conf['ticker']), alignment)
+            combined = combined.dropna(subset=['Close'])
+        
+        # 4. Derived positioning metrics (all trader categories), cached with the bundle
+        with perf.span("positioning"), memprofile.stage("positioning"):
+            combined = Positioning.add_metrics(combined, asset_conf['multiplier'])
+        
+        # Sorted DatetimeIndex -> range selection by binary search (see timeseries.select_range)
+        combined = index_by_date(combined)
         
-        return combined
+        # 5. By-product: Arrow/Parquet export for notebooks/downstream jobs (pyarrow optional)
+        try:
+            with memprofile.stage("export"):
+                PanelExporter.export(combined, asset_conf, start_year)
+        except Exception as e:
+            print(f"Panel export failed for {asset_conf.get('symbol')}: {e}")
+        return combined, price_df
@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import random
+import hashlib
+import datetime
+import threading
+from src.config import (
+    CACHE_MANIFEST_FILE, CFTC_DOWNLOAD_TIMEOUT, CFTC_DOWNLOAD_RETRIES, CFTC_DOWNLOAD_BACKOFF
+)
+
+CHUNK_SIZE = 1 << 16
+
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class NotModified(Exception):
+    """Conditional request answered 304 (the cached copy is current)."""
+
+
+def download_file(url, dest_path, conditional=None, timeout=CFTC_DOWNLOAD_TIMEOUT,
+                  retries=CFTC_DOWNLOAD_RETRIES, backoff=CFTC_DOWNLOAD_BACKOFF):
+    """
+    Streams url to dest_path via '<dest>.part' and renames it into place when complete.
+    - An existing .part file is resumed with a Range request (If-Range on the first response's
+      validator, so a changed file restarts from zero instead of being spliced).
+    - Network errors and truncated bodies are retried with exponential backoff.
+    - conditional={"etag", "last_modified"} -> If-None-Match / If-Modified-Since; raises NotModified on 304.
+    Returns {"size", "etag", "last_modified"}.
+    """
+    import requests  # Lazy import (only needed on cache miss)
+
+    part_path = f"{dest_path}.part"
+    validator_path = f"{part_path}.json"
+    attempt = 0
+    while True:
+        headers = {}
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        validator = {}
+        if offset:
+            try:
+                with open(validator_path) as f:
+                    validator = json.load(f)
+            except (OSError, ValueError):
+                offset = 0
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            if validator.get("etag") or validator.get("last_modified"):
+                headers["If-Range"] = validator.get("etag") or validator.get("last_modified")
+        elif conditional:
+            if conditional.get("etag"):
+                headers["If-None-Match"] = conditional["etag"]
+            if conditional.get("last_modified"):
+                headers["If-Modified-Since"] = conditional["last_modified"]
+
+        try:
+            with requests.get(url, headers=headers, stream=True, timeout=timeout) as r:
+                if r.status_code == 304:
+                    raise NotModified(url)
+                if r.status_code == 416:
+                    # Range not satisfiable: stale/over-long part file -> start over
+                    os.remove(part_path)
+                    raise IOError("Range not satisfiable, restarting download")
+                r.raise_for_status()
+
+                if r.status_code == 206:
+                    mode = "ab"
+                    expected = int(r.headers["Content-Range"].rsplit("/", 1)[1]) if "/" in r.headers.get("Content-Range", "") else None
+                else:
+                    mode, offset = "wb", 0  # Server ignored Range (or file changed): full body
+                    validator = {"etag": r.headers.get("ETag"), "last_modified": r.headers.get("Last-Modified")}
+                    with open(validator_path, "w") as f:
+                        json.dump(validator, f)
+                    expected = int(r.headers["Content-Length"]) if r.headers.get("Content-Length") else None
+
+                with open(part_path, mode) as f:
+                    for chunk in r.iter_content(CHUNK_SIZE):
+                        f.write(chunk)
+
+            size = os.path.getsize(part_path)
+            if expected is not None and size != expected:
+                raise IOError(f"Incomplete download ({size}/{expected} bytes)")
+            break
+        except NotModified:
+            raise
+        except (requests.RequestException, IOError) as e:
+            attempt += 1
+            if attempt > retries:
+                raise
+            delay = backoff * (2 ** (attempt - 1)) * (0.5 + random.random())
+            print(f"Download of {url} failed ({e}); retry {attempt}/{retries} in {delay:.1f}s")
+            time.sleep(delay)
+
+    os.replace(part_path, dest_path)
+    if os.path.exists(validator_path):
+        os.remove(validator_path)
+    return {"size": size, "etag": validator.get("etag"), "last_modified": validator.get("last_modified")}
+
+
+class CacheManifest:
+    """
+    Checksums of the files in CACHE_DIR ({"version": 1, "files": {name: {...}}}), so corrupt or
+    partial cache files are caught before parsing (size check, then sha256), not by a failed parse.
+    """
+    VERSION = 1
+    _lock = threading.Lock()
+
+    def __init__(self, path=CACHE_MANIFEST_FILE):
+        self.path = path
+
+    def _read(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == self.VERSION:
+                return data
+        except (OSError, ValueError):
+            pass
+        return {"version": self.VERSION, "files": {}}
+
+    def get(self, name):
+        return self._read()["files"].get(name)
+
+    def record(self, name, path, **meta):
+        """Stores size + sha256 of path (plus meta such as etag/source checksum) under name."""
+        entry = {
+            "size": os.path.getsize(path),
+            "sha256": sha256_file(path),
+            "recorded_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            **meta,
+        }
+        with self._lock:
+            data = self._read()
+            data["files"][name] = entry
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=1)
+            os.replace(tmp_path, self.path)
+        return entry
+
+    def verify(self, name, path):
+        """True only if path exists and matches its recorded size and checksum."""
+        entry = self.get(name)
+        if entry is None or not os.path.exists(path):
+            return False
+        if os.path.getsize(path) != entry["size"]:
+            return False
+        return sha256_file(path) == entry["sha256"]
@@ -0,0 +1,216 @@
+import os
+import json
+import datetime
+import threading
+import numpy as np
+import pandas as pd
+from src.config import EXPORT_DIR, EXPORT_FORMATS
+from src.analysis.backtester import Backtester
+from src import perf
+
+# Bump when a dataset's columns/types change incompatibly
+SCHEMA_VERSION = 1
+DATASETS = ("panel", "signals", "ledger")
+FILE_EXTENSIONS = {"arrow": "arrow", "parquet": "parquet"}
+
+
+def _to_arrow_frame(df):
+    """Fixed column types so every partition of a dataset shares one schema."""
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if pd.api.types.is_bool_dtype(s) or pd.api.types.is_datetime64_any_dtype(s):
+            out[col] = s
+        elif pd.api.types.is_numeric_dtype(s):
+            out[col] = s.astype("float64")
+        else:
+            out[col] = s.astype("string")
+    return pd.DataFrame(out)
+
+
+class PanelExporter:
+    """
+    Writes the merged weekly panel (CFTC + aligned prices + derived metrics), the per-week
+    signals and the backtest ledger as hive-partitioned datasets:
+        EXPORT_DIR/<format>/<dataset>/asset=<symbol>/year=<yyyy>/part.<ext>   (format: arrow | parquet)
+    plus EXPORT_DIR/manifest.json (bumped on every write). Arrow IPC files are written
+    uncompressed so readers can memory-map them without copying (PanelExporter.read).
+    """
+    _lock = threading.Lock()
+
+    @staticmethod
+    def available():
+        try:
+            import pyarrow  # noqa: F401  (optional dependency)
+            return bool(EXPORT_FORMATS)
+        except ImportError:
+            return False
+
+    @staticmethod
+    def signals_frame(combined):
+        """Every week's OI/price change and its Backtester.classify pattern (NEUTRAL weeks included)."""
+        oi = combined['Lev_Money_Positions_Short_All'].to_numpy(dtype=float)
+        price = combined['Close'].to_numpy(dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            oi_pct = np.r_[np.nan, (oi[1:] - oi[:-1]) / oi[:-1] * 100]
+            price_pct = np.r_[np.nan, (price[1:] - price[:-1]) / price[:-1] * 100]
+        oi_pct[~np.isfinite(oi_pct)] = np.nan
+        price_pct[~np.isfinite(price_pct)] = np.nan
+        classified = [Backtester.classify(o, p) for o, p in zip(oi_pct, price_pct)]
+        return pd.DataFrame({
+            "Date": pd.to_datetime(combined['Date']).to_numpy(),
+            "oi_pct": oi_pct,
+            "price_pct": price_pct,
+            "signal": [c[0] for c in classified],
+            "pattern": [c[1] for c in classified],
+        })
+
+    @staticmethod
+    def build_frames(combined):
+        ledger = Backtester.run(combined, start_date=pd.Timestamp(combined['Date'].iloc[0]).strftime('%Y-%m-%d'))["ledger"]
+        ledger = ledger.assign(Date=pd.to_datetime(ledger["date"])).drop(columns="date")
+        return {
+            "panel": combined.reset_index(drop=True),
+            "signals": PanelExporter.signals_frame(combined),
+            "ledger": ledger,
+        }
+
+    @staticmethod
+    def _partition_path(dataset, symbol, year, fmt):
+        return os.path.join(EXPORT_DIR, fmt, dataset, f"asset={symbol}", f"year={year}", f"part.{FILE_EXTENSIONS[fmt]}")
+
+    @staticmethod
+    def _write_table(table, path, fmt):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        if fmt == "arrow":
+            with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        else:
+            pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def read_manifest():
+        try:
+            with open(os.path.join(EXPORT_DIR, "manifest.json"), encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("schema_version") == SCHEMA_VERSION:
+                return manifest
+        except (OSError, ValueError):
+            pass
+        return {"schema_version": SCHEMA_VERSION, "version": 0, "datasets": {d: {} for d in DATASETS}}
+
+    @staticmethod
+    def _write_manifest(manifest):
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        path = os.path.join(EXPORT_DIR, "manifest.json")
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    @perf.timed("PanelExporter.export")
+    def export(combined, asset_conf, start_year):
+        """
+        Writes all datasets for one asset, one partition per year.
+        An asset's partitions always come from one start year, so the panel warm-up and the
+        ledger's capital path are consistent across years:
+          - a load from a later start year than the exported one writes nothing;
+          - an earlier start year replaces the asset's whole set (stale years removed);
+          - the same start year only rewrites partitions with a newer report date, so
+            reloading the same data writes nothing.
+        Returns the number of partitions written.
+        """
+        if combined.empty or not PanelExporter.available():
+            return 0
+        import pyarrow as pa
+
+        symbol = asset_conf['symbol']
+        data_version = pd.Timestamp(combined['Date'].iloc[-1]).strftime('%Y-%m-%d')
+        written = removed = 0
+
+        with PanelExporter._lock:
+            manifest = PanelExporter.read_manifest()
+            exported_starts = [
+                entry["source_start_year"]
+                for dataset in DATASETS
+                for entry in manifest["datasets"].get(dataset, {}).get(symbol, {}).values()
+            ]
+            exported_start = min(exported_starts, default=None)
+            # Shorter history than the exported set -> keep the longer run
+            if exported_start is not None and start_year > exported_start:
+                return 0
+            replace_all = exported_start is None or start_year < exported_start
+
+            def up_to_date(entry):
+                return not replace_all and entry is not None and entry["data_version"] >= data_version
+
+            # Same report already exported from this start year -> nothing to build
+            panel_entries = manifest["datasets"].get("panel", {}).get(symbol, {})
+            if all(up_to_date(panel_entries.get(str(y))) for y in combined['Date'].dt.year.unique()):
+                return 0
+
+            for dataset, frame in PanelExporter.build_frames(combined).items():
+                entries = manifest["datasets"].setdefault(dataset, {}).setdefault(symbol, {})
+                years = frame['Date'].dt.year.to_numpy() if not frame.empty else np.array([], dtype=int)
+                if replace_all:
+                    # Years the new run doesn't cover would otherwise keep the old run's rows
+                    for key in set(entries) - {str(year) for year in np.unique(years)}:
+                        for path in entries.pop(key)["files"].values():
+                            path = os.path.join(EXPORT_DIR, path)
+                            try:
+                                os.remove(path)
+                                os.rmdir(os.path.dirname(path))  # year=<yyyy> dir, once empty
+                            except OSError:
+                                pass
+                        removed += 1
+                for year in np.unique(years):
+                    key = str(year)
+                    if up_to_date(entries.get(key)):
+                        continue
+                    table = pa.Table.from_pandas(_to_arrow_frame(frame[years == year]), preserve_index=False)
+                    files = {}
+                    for fmt in EXPORT_FORMATS:
+                        path = PanelExporter._partition_path(dataset, symbol, key, fmt)
+                        PanelExporter._write_table(table, path, fmt)
+                        files[fmt] = os.path.relpath(path, EXPORT_DIR)
+                    entries[key] = {
+                        "rows": table.num_rows,
+                        "files": files,
+                        "data_version": data_version,
+                        "source_start_year": start_year,
+                        "written_at": datetime.datetime.now().isoformat(timespec="seconds"),
+                    }
+                    written += 1
+            if written or removed:
+                manifest["version"] += 1
+                manifest["updated_at"] = datetime.datetime.now().isoformat(timespec="seconds")
+                PanelExporter._write_manifest(manifest)
+        return written
+
+    @staticmethod
+    def read(dataset, asset=None, years=None):
+        """
+        Loads a dataset as one pyarrow Table by memory-mapping its Arrow IPC partitions
+        (zero-copy: column buffers point into the mapped files). asset = symbol (e.g. "BTC").
+        For scans/filters across everything, pyarrow.dataset works on the same tree:
+            ds.dataset(f"{EXPORT_DIR}/arrow/panel", format="ipc", partitioning="hive")
+        """
+        import pyarrow as pa
+
+        tables = []
+        for symbol, entries in sorted(PanelExporter.read_manifest()["datasets"].get(dataset, {}).items()):
+            if asset is not None and symbol != asset:
+                continue
+            for key, entry in sorted(entries.items()):
+                if years is not None and int(key) not in years or "arrow" not in entry["files"]:
+                    continue
+                source = pa.memory_map(os.path.join(EXPORT_DIR, entry["files"]["arrow"]), "r")
+                table = pa.ipc.open_file(source).read_all()
+                tables.append(table.append_column("asset", pa.array([symbol] * table.num_rows)))
+        return pa.concat_tables(tables) if tables else None
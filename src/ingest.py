@@ -0,0 +1,60 @@
+import asyncio
+import contextvars
+import concurrent.futures
+from src.config import INGEST_MAX_CONCURRENCY, INGEST_TIMEOUT
+from src import perf, memprofile
+
+
+def _run_job(executor, name, func, *args, **tags):
+    """Schedules one blocking fetch/parse job on the pipeline's executor (perf context carried over)."""
+    def job():
+        with perf.span(f"ingest.{name}", **tags), memprofile.stage(name, top=0, **tags):
+            return func(*args)
+    ctx = contextvars.copy_context()
+    return asyncio.get_running_loop().run_in_executor(executor, ctx.run, job)
+
+
+async def ingest(start_year, end_year, asset_conf, max_concurrency=INGEST_MAX_CONCURRENCY, timeout=INGEST_TIMEOUT):
+    """
+    Fetches the CFTC years (download + parse) and the price history concurrently.
+    Returns (cftc_df, price_df) with the same content as get_cftc_data / get_price_data,
+    so a cold load takes about as long as the slowest single fetch instead of their sum.
+    - At most max_concurrency jobs run at once (1 while memory profiling, whose stage stack is global).
+    - Jobs run on a dedicated thread pool, not the loop's default executor (which asyncio.run
+      joins on exit). If a job fails or the timeout expires, the error is raised right away:
+      queued jobs are cancelled and a fetch already running is left to finish in its thread.
+    """
+    from src.data_loader import DataLoader  # Circular import (DataLoader uses this module)
+
+    workers = 1 if memprofile.is_enabled() else max(1, max_concurrency)
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest")
+    try:
+        # Price first: usually the slowest single request, so it should get a worker right away
+        jobs = [_run_job(executor, "get_price_data", DataLoader.get_price_data, asset_conf['ticker'], start_year, end_year)]
+        jobs += [
+            _run_job(executor, "cftc.year", DataLoader.download_and_read_cftc_year, year, asset_conf['cftc_name'], year=year)
+            for year in range(start_year, end_year + 1)
+        ]
+        price_df, *year_dfs = await asyncio.wait_for(asyncio.gather(*jobs), timeout)
+    finally:
+        # Never waits: on success every job is done, on error/timeout the caller isn't held up
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return DataLoader.combine_cftc_years(year_dfs), price_df
+
+
+def run_ingest(start_year, end_year, asset_conf, **kwargs):
+    """
+    Synchronous wrapper for Streamlit / scripts. Inside an already running event loop
+    (e.g. a notebook) the pipeline runs on its own loop in a helper thread.
+    """
+    coro = ingest(start_year, end_year, asset_conf, **kwargs)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    try:
+        return pool.submit(asyncio.run, coro).result()
+    finally:
+        pool.shutdown(wait=False)
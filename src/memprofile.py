@@ -0,0 +1,115 @@
+import os
+import tracemalloc
+import functools
+import itertools
+import contextlib
+
+# Memory profiling mode for the data load path: CFTC_MEMPROFILE=1 (benchmarks/memprofile_load.py sets it), or enable().
+# Off by default; stage() is a no-op then.
+_enabled = os.environ.get("CFTC_MEMPROFILE", "0") not in ("", "0")
+
+_open_stages = []
+_records = []
+_order = itertools.count()
+
+MB = 1024 * 1024
+
+# Hide the profiler's own and the import machinery's allocations from the snapshot diffs
+_SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+]
+
+
+def enable(flag=True):
+    global _enabled
+    _enabled = flag
+
+
+def is_enabled():
+    return _enabled
+
+
+def _fold_peak():
+    """Pushes the peak since the last reset into every open stage, then resets it."""
+    peak = tracemalloc.get_traced_memory()[1]
+    for stage in _open_stages:
+        stage["peak"] = max(stage["peak"], peak)
+    tracemalloc.reset_peak()
+
+
+@contextlib.contextmanager
+def stage(name, top=3, **tags):
+    """
+    Measures one load stage with tracemalloc:
+    - peak_mb: highest traced memory above the stage's starting point
+    - retained_mb: memory still held when the stage ends (e.g. the resulting DataFrame)
+    - top: largest allocation sites retained, from a snapshot diff
+    When the outermost stage finishes, the collected report is printed.
+    """
+    if not _enabled:
+        yield
+        return
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+    _fold_peak()
+    start_current = tracemalloc.get_traced_memory()[0]
+    start_snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS) if top else None
+    entry = {"peak": start_current, "depth": len(_open_stages), "order": next(_order)}
+    _open_stages.append(entry)
+    try:
+        yield
+    finally:
+        _fold_peak()
+        _open_stages.pop()
+        end_current = tracemalloc.get_traced_memory()[0]
+
+        record = {
+            "stage": name,
+            **tags,
+            "depth": entry["depth"],
+            "order": entry["order"],
+            "peak_mb": round((entry["peak"] - start_current) / MB, 2),
+            "retained_mb": round((end_current - start_current) / MB, 2),
+        }
+        if start_snapshot is not None:
+            diff = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS).compare_to(start_snapshot, "lineno")
+            record["top"] = [
+                f"{s.traceback[0].filename.split(os.sep)[-1]}:{s.traceback[0].lineno} {s.size_diff / MB:+.1f}MB"
+                for s in diff[:top] if s.size_diff > 0
+            ]
+        _records.append(record)
+
+        if not _open_stages:
+            print(report())
+            _records.clear()
+
+
+def profiled(name, top=0):
+    """Decorator form of stage() (no snapshot diff by default)."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name, top=top):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def records():
+    return list(_records)
+
+
+def report(entries=None):
+    """Text table of peak/retained memory per stage (nested stages indented)."""
+    entries = _records if entries is None else entries
+    lines = [f"{'stage':<34} {'year':>6} {'peak MB':>9} {'retained MB':>12}  top allocations"]
+    # Stages are recorded on exit (inner first); show them in start order instead
+    for r in sorted(entries, key=lambda r: r["order"]):
+        name = "  " * r["depth"] + r["stage"]
+        year = r.get("year", "")
+        lines.append(f"{name:<34} {year!s:>6} {r['peak_mb']:>9.1f} {r['retained_mb']:>12.1f}  {'; '.join(r.get('top', []))}")
+    return "\n".join(lines)
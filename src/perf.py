@@ -0,0 +1,83 @@
+import os
+import sys
+import json
+import time
+import logging
+import functools
+import contextlib
+import contextvars
+from collections import deque
+
+# Structured JSON timing logs ("cftc.perf"); set CFTC_PERF_LOG=0 to silence
+logger = logging.getLogger("cftc.perf")
+if not logger.handlers:
+    _handler = logging.StreamHandler(sys.stderr)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.propagate = False
+logger.setLevel(logging.INFO if os.environ.get("CFTC_PERF_LOG", "1") != "0" else logging.WARNING)
+
+# Spans of the current rerun (set by start_run) and the stack of open spans.
+# contextvars (not thread-locals) so asyncio tasks / to_thread workers report into the same run.
+_run_records = contextvars.ContextVar("perf_run_records", default=None)
+_open_spans = contextvars.ContextVar("perf_open_spans", default=())
+
+
+def start_run(max_records=200):
+    """Starts collecting spans for a new rerun; returns the record list."""
+    records = deque(maxlen=max_records)
+    _run_records.set(records)
+    return records
+
+
+def last_run():
+    """Spans recorded since the last start_run() (oldest first)."""
+    records = _run_records.get()
+    return list(records) if records is not None else []
+
+
+def record(name, ms, **fields):
+    """Records an already-measured timing."""
+    entry = {"span": name, "ms": round(ms, 1), **fields}
+    records = _run_records.get()
+    if records is not None:
+        records.append(entry)
+    logger.info(json.dumps(entry, ensure_ascii=False, default=str))
+    return entry
+
+
+def annotate(**fields):
+    """Adds fields (e.g. cache="miss") to the innermost open span."""
+    spans = _open_spans.get()
+    if spans:
+        spans[-1].update(fields)
+
+
+@contextlib.contextmanager
+def span(name, **fields):
+    """
+    Times a block. Yields the span's field dict, so callers can add flags:
+        with perf.span("cftc.download", year=2024) as s:
+            s["cache"] = "hit"
+    """
+    fields = dict(fields)
+    token = _open_spans.set(_open_spans.get() + (fields,))
+    t0 = time.perf_counter()
+    try:
+        yield fields
+    finally:
+        _open_spans.reset(token)
+        record(name, (time.perf_counter() - t0) * 1000, **fields)
+
+
+def timed(name=None):
+    """Decorator form of span(); defaults to the function's qualified name."""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
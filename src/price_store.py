@@ -0,0 +1,190 @@
+import os
+import re
+import json
+import time
+import threading
+import pandas as pd
+from src.config import PRICE_CACHE_DIR, PRICE_CACHE_TTL
+from src import perf
+
+# Aligned weekly price columns per policy (see PRICE_ALIGNMENT in config)
+ALIGNMENT_COLUMNS = {
+    "asof": "Price_Asof",
+    "release": "Price_Release",
+    "next_open": "Price_Next_Open",
+}
+
+# CFTC: positions as of Tuesday, released that Friday. Holiday weeks shift the as-of date
+# (e.g. Monday 2018-12-24) but the report still comes out on the Friday of that week.
+RELEASE_WEEKDAY = 4
+# Bumped when the stored alignment table layout changes (older tables are rebuilt from daily)
+ALIGNMENT_TABLE_VERSION = 2
+
+
+def release_dates(dates):
+    """As-of date -> release day: the Friday on or after it (Tuesday +3, holiday Monday +4, Wednesday +2)."""
+    dates = pd.DatetimeIndex(dates).normalize()
+    return dates + pd.to_timedelta((RELEASE_WEEKDAY - dates.weekday) % 7, unit="D")
+
+
+def build_weekly_table(price_df):
+    """
+    Price alignment table keyed by calendar day over the daily price range, so any as-of date
+    (Tuesday or a holiday-week Monday/Wednesday) joins on its own date. One column per policy:
+      Price_Asof       last Close on or before the as-of date
+      Price_Release    last Close on or before its release Friday (NaN until that Friday has a bar)
+      Price_Next_Open  Open of the first bar after the release Friday (NaN until it exists)
+    Every value only uses bars at or before its own timestamp -> no look-ahead.
+    """
+    if price_df.empty:
+        return pd.DataFrame(columns=list(ALIGNMENT_COLUMNS.values()))
+    days = pd.DatetimeIndex(price_df.index).normalize()
+    close = price_df['Close'].to_numpy()
+    opens = price_df['Open'].to_numpy() if 'Open' in price_df.columns else close
+
+    asof_days = pd.date_range(days[0], days[-1], freq="D")
+    fridays = release_dates(asof_days)
+
+    asof_pos = days.searchsorted(asof_days, side="right") - 1
+    release_pos = days.searchsorted(fridays, side="right") - 1
+    next_pos = days.searchsorted(fridays, side="right")
+
+    def take(values, pos, valid):
+        out = pd.Series(float("nan"), index=asof_days)
+        out[valid] = values[pos[valid]]
+        return out
+
+    return pd.DataFrame({
+        "Price_Asof": take(close, asof_pos, asof_pos >= 0),
+        "Price_Release": take(close, release_pos, (release_pos >= 0) & (fridays <= days[-1])),
+        "Price_Next_Open": take(opens, next_pos, next_pos < len(days)),
+    }, index=asof_days)
+
+
+def align_weekly(cftc_df, weekly_table, policy="asof"):
+    """
+    Attaches the aligned prices to CFTC rows by as-of date (hash join, no nearest-date search).
+    'Close' is the selected policy's price; all policy columns are kept.
+    """
+    if policy not in ALIGNMENT_COLUMNS:
+        raise ValueError(f"Unknown price alignment: {policy}")
+    keys = pd.DatetimeIndex(cftc_df['Date']).normalize()
+    aligned = weekly_table.reindex(keys)
+    aligned.index = cftc_df.index
+    combined = pd.concat([cftc_df, aligned], axis=1)
+    combined['Close'] = combined[ALIGNMENT_COLUMNS[policy]]
+    return combined
+
+
+class PriceStore:
+    """
+    Daily prices per ticker on disk (PRICE_CACHE_DIR/<ticker>.csv) with the aligned weekly
+    table stored next to it (<ticker>.weekly.csv) and a small meta file (fetch times, covered
+    range). Only the recent tail is re-fetched, at most every PRICE_CACHE_TTL; older history
+    is served from the store.
+    """
+    _lock = threading.Lock()
+    _memory = {}  # ticker -> {"daily", "weekly", "checked_at", "covered_from"}
+
+    @staticmethod
+    def _paths(ticker):
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", ticker)
+        base = os.path.join(PRICE_CACHE_DIR, slug)
+        return f"{base}.csv", f"{base}.weekly.csv", f"{base}.meta.json"
+
+    @staticmethod
+    def _load(ticker):
+        with PriceStore._lock:
+            entry = PriceStore._memory.get(ticker)
+        if entry is not None:
+            return entry
+        daily_path, weekly_path, meta_path = PriceStore._paths(ticker)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            daily = pd.read_csv(daily_path, index_col=0, parse_dates=True)
+            if meta.get("table_version") == ALIGNMENT_TABLE_VERSION:
+                weekly = pd.read_csv(weekly_path, index_col=0, parse_dates=True)
+            else:
+                weekly = build_weekly_table(daily)  # stored with an older layout
+            entry = {
+                "daily": daily,
+                "weekly": weekly,
+                "checked_at": meta["checked_at"],
+                "covered_from": pd.Timestamp(meta["covered_from"]),
+            }
+        except (OSError, ValueError, KeyError):
+            return None
+        with PriceStore._lock:
+            PriceStore._memory[ticker] = entry
+        return entry
+
+    @staticmethod
+    def _save(ticker, daily, covered_from, checked_at):
+        entry = {"daily": daily, "weekly": build_weekly_table(daily), "checked_at": checked_at, "covered_from": covered_from}
+        os.makedirs(PRICE_CACHE_DIR, exist_ok=True)
+        daily_path, weekly_path, meta_path = PriceStore._paths(ticker)
+        for path, frame in ((daily_path, entry["daily"]), (weekly_path, entry["weekly"])):
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            frame.to_csv(tmp_path)
+            os.replace(tmp_path, path)
+        tmp_path = f"{meta_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"checked_at": checked_at, "covered_from": covered_from.strftime('%Y-%m-%d'),
+                       "table_version": ALIGNMENT_TABLE_VERSION}, f)
+        os.replace(tmp_path, meta_path)
+        with PriceStore._lock:
+            PriceStore._memory[ticker] = entry
+        return entry
+
+    @staticmethod
+    def clear_memory():
+        with PriceStore._lock:
+            PriceStore._memory.clear()
+
+    @staticmethod
+    def get(ticker, start_date, end_date, fetch):
+        """
+        Daily prices for [start_date, end_date] via the store. fetch(ticker, start, end) is only
+        called for ranges the store doesn't have (older history, or the tail once the TTL expired).
+        """
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        entry = PriceStore._load(ticker)
+        now = time.time()
+
+        if entry is None or entry["daily"].empty:
+            daily = fetch(ticker, start_date, end_date)
+            if daily.empty:
+                return daily
+            entry = PriceStore._save(ticker, daily.sort_index(), start, now)
+            return entry["daily"].loc[start:end]
+
+        daily, covered_from, checked_at = entry["daily"], entry["covered_from"], entry["checked_at"]
+        parts = [daily]
+        if start < covered_from:
+            with perf.span("price.store", ticker=ticker, part="history"):
+                history = fetch(ticker, start_date, covered_from.strftime('%Y-%m-%d'))
+            # Fetchers return an empty frame on network errors: only mark the range covered once
+            # it actually came back, so a transient failure is retried on the next load
+            if not history.empty:
+                parts.insert(0, history)
+                covered_from = start
+        last = daily.index[-1]
+        if end > last and now - checked_at > PRICE_CACHE_TTL:
+            # Re-fetch the last week too (the latest daily bar may have been partial)
+            with perf.span("price.store", ticker=ticker, part="tail"):
+                parts.append(fetch(ticker, (last - pd.Timedelta(days=7)).strftime('%Y-%m-%d'), end_date))
+            checked_at = now
+
+        if len(parts) > 1:
+            merged = pd.concat([p for p in parts if not p.empty])
+            merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+            daily = PriceStore._save(ticker, merged, covered_from, checked_at)["daily"]
+
+        return daily.loc[start:end]
+
+    @staticmethod
+    def weekly_table(ticker):
+        """Price alignment table for everything stored for the ticker (empty if nothing stored)."""
+        entry = PriceStore._load(ticker)
+        return entry["weekly"] if entry else build_weekly_table(pd.DataFrame())
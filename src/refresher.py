@@ -0,0 +1,125 @@
+import time
+import threading
+import contextvars
+from collections import OrderedDict
+from src.singleflight import SingleFlight
+from src import perf
+
+_revalidating = contextvars.ContextVar("revalidating", default=False)
+
+
+def revalidating():
+    """True inside a background refresh: loaders should fetch fresh data instead of serving stale copies."""
+    return _revalidating.get()
+
+
+class BackgroundRefresher:
+    """Runs refresh jobs on daemon threads, at most one per key at a time."""
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._running = set()
+
+    def submit(self, key, func, *args):
+        """Starts func(*args) in the background unless a refresh for key is already running."""
+        with self._lock:
+            if key in self._running:
+                return False
+            self._running.add(key)
+
+        def run():
+            _revalidating.set(True)
+            try:
+                with perf.span("refresh", group=self.name, key=str(key)):
+                    func(*args)
+            except Exception as e:
+                print(f"Background refresh ({self.name}, {key}) failed: {e}")
+            finally:
+                with self._lock:
+                    self._running.discard(key)
+
+        threading.Thread(target=run, name=f"refresh-{self.name}", daemon=True).start()
+        return True
+
+    def is_running(self, key):
+        with self._lock:
+            return key in self._running
+
+
+class StaleWhileRevalidateCache:
+    """
+    In-process LRU cache that doesn't block on refreshes once warm: an entry older than
+    max_age is still returned, while a background thread rebuilds it and swaps the new
+    value in (a single dict assignment, so readers see either the old or the new value).
+    Cold keys are built by the caller; concurrent callers share one build.
+    Values failing `valid` (e.g. an upstream outage) are never stored - a refresh that
+    fails (invalid value or an exception) keeps serving the last good value and is retried after retry_after seconds.
+    """
+
+    def __init__(self, name, max_age, max_entries, valid=lambda value: value is not None, retry_after=60):
+        self.max_age = max_age
+        self.retry_after = retry_after
+        self.max_entries = max_entries
+        self.valid = valid
+        self._entries = OrderedDict() # key -> {"value", "built_at", "refresh_at"}
+        self._lock = threading.Lock()
+        self._flight = SingleFlight(name)
+        self._refresher = BackgroundRefresher(name)
+
+    def get(self, key, build, *args):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None:
+            perf.annotate(cache="miss")
+            return self._flight.do(key, self._build, key, build, args)
+
+        if time.time() >= entry["refresh_at"]:
+            perf.annotate(cache="stale")
+            self._refresher.submit(key, self._build, key, build, args)
+        return entry["value"]
+
+    def _build(self, key, build, args):
+        try:
+            value = build(*args)
+        except Exception:
+            self._retry_later(key)
+            raise
+        now = time.time()
+        with self._lock:
+            if self.valid(value):
+                self._entries[key] = {"value": value, "built_at": now, "refresh_at": now + self.max_age}
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            elif key in self._entries:
+                # Keep the last good value; next refresh attempt in retry_after seconds
+                self._entries[key] = dict(self._entries[key], refresh_at=now + self.retry_after)
+        return value
+
+    def _retry_later(self, key):
+        """A build raised (timeout, outage): keep the last good value, retry after retry_after seconds."""
+        with self._lock:
+            if key in self._entries:
+                self._entries[key] = dict(self._entries[key], refresh_at=time.time() + self.retry_after)
+
+    def status(self, key):
+        """{"value", "built_at", "refreshing"} for a cached key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return {"value": entry["value"], "built_at": entry["built_at"], "refreshing": self._refresher.is_running(key)}
+
+    def expire(self, key=None):
+        """Marks one (or every) entry due for a background refresh on its next read."""
+        with self._lock:
+            for k in ([key] if key is not None else list(self._entries)):
+                if k in self._entries:
+                    self._entries[k] = dict(self._entries[k], refresh_at=0)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,119 @@
+import threading
+from src import perf
+
+
+class SingleFlightAborted(RuntimeError):
+    """The leading call of a shared stream stopped before finishing (e.g. its session went away)."""
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _StreamCall:
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.items = []
+        self.finished = False
+        self.completed = False
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Request coalescing (Go's singleflight): while a call for a key is running, other callers
+    with the same key wait for it and get its result (or its exception) instead of starting
+    their own. Nothing is cached once the call returns - that's the caches' job.
+        flight = SingleFlight("cftc.year")
+        df = flight.do(2024, load_year, 2024)
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.stats = {"calls": 0, "shared": 0}
+
+    def _join(self, key, factory):
+        with self._lock:
+            self.stats["calls"] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                self.stats["shared"] += 1
+                return call, False
+            call = self._calls[key] = factory()
+            return call, True
+
+    def _leave(self, key):
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def do(self, key, func, *args, **kwargs):
+        call, leader = self._join(key, _Call)
+        if not leader:
+            with perf.span("singleflight.wait", group=self.name):
+                call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            self._leave(key)
+            call.done.set()
+
+    def stream(self, key, func, *args, **kwargs):
+        """
+        Generator variant for streamed results (e.g. LLM chunks): the leader iterates func(...),
+        followers replay every item produced so far and then follow along live.
+        If the leader is closed early, followers get SingleFlightAborted.
+        """
+        call, leader = self._join(key, _StreamCall)
+        if leader:
+            yield from self._lead(key, call, func(*args, **kwargs))
+        else:
+            perf.annotate(coalesced=self.name)
+            yield from self._follow(call)
+
+    def _lead(self, key, call, items):
+        try:
+            for item in items:
+                with call.cond:
+                    call.items.append(item)
+                    call.cond.notify_all()
+                yield item
+            call.completed = True
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            self._leave(key)
+            with call.cond:
+                call.finished = True
+                call.cond.notify_all()
+
+    @staticmethod
+    def _follow(call):
+        seen = 0
+        while True:
+            with call.cond:
+                while seen == len(call.items) and not call.finished:
+                    call.cond.wait()
+                batch = call.items[seen:]
+                seen = len(call.items)
+                finished = call.finished
+            yield from batch
+            if finished:
+                break
+        if call.error is not None:
+            raise call.error
+        if not call.completed:
+            raise SingleFlightAborted("The shared request was cancelled; please retry.")
@@ -0,0 +1,141 @@
+import os
+import re
+import json
+import datetime
+import pandas as pd
+from src.config import SNAPSHOT_DIR, SNAPSHOT_RECHECK_INTERVAL, DEFAULT_START_YEAR
+from src.timeseries import default_analysis_range, next_release_due
+from src.analysis.market_analyzer import MarketAnalyzer
+from src.analysis.weekly_log import WeeklyLogs
+from src import perf
+
+# Sidebar defaults the snapshot chart is built with
+DEFAULT_CHART_OPTIONS = {"show_dollar": False, "highlight": True}
+
+
+class SnapshotStore:
+    """
+    Materialized "latest week" view per asset: analysis result, weekly logs, the weekly
+    rows the narrative is built from and the pre-serialized chart for the default view
+    (DEFAULT_START_YEAR ~ current year, default 12-week window, default chart options).
+    A snapshot is rebuilt only once the next weekly report is due (release calendar),
+    then at most every SNAPSHOT_RECHECK_INTERVAL until a newer report date shows up.
+    """
+
+    @staticmethod
+    def _path(asset_name):
+        slug = re.sub(r"[^a-z0-9]+", "_", asset_name.lower()).strip("_")
+        return os.path.join(SNAPSHOT_DIR, f"{slug}.json")
+
+    @staticmethod
+    def default_years():
+        return DEFAULT_START_YEAR, datetime.datetime.now().year
+
+    @staticmethod
+    def is_default_view(settings):
+        return (
+            (settings["start_year"], settings["end_year"]) == SnapshotStore.default_years()
+            and settings["show_dollar"] == DEFAULT_CHART_OPTIONS["show_dollar"]
+            and settings["highlight"] == DEFAULT_CHART_OPTIONS["highlight"]
+        )
+
+    @staticmethod
+    def load(asset_name):
+        try:
+            with open(SnapshotStore._path(asset_name), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def is_fresh(snapshot, now=None):
+        """True until the next report is due; after that, only within the recheck interval."""
+        if snapshot is None or snapshot.get("end_year") != datetime.datetime.now().year:
+            return False
+        if "weekly_logs" not in snapshot: # Written before columnar weekly logs -> rebuild
+            return False
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        if now < next_release_due(snapshot["report_date"]):
+            return True
+        checked_at = datetime.datetime.fromisoformat(snapshot["checked_at"])
+        return (now - checked_at).total_seconds() < SNAPSHOT_RECHECK_INTERVAL
+
+    @staticmethod
+    def load_fresh(asset_name):
+        snapshot = SnapshotStore.load(asset_name)
+        return snapshot if SnapshotStore.is_fresh(snapshot) else None
+
+    @staticmethod
+    @perf.timed("SnapshotStore.build")
+    def build(asset_name, combined_df, price_df, asset_conf):
+        """
+        Materializes the default view from already-loaded data and stores it.
+        If the report date did not change, only the recheck timestamp is refreshed.
+        """
+        from src.ui import charts  # plotly only needed when (re)building
+
+        now = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+        report_date = combined_df.index[-1].strftime('%Y-%m-%d')
+        start_year, end_year = SnapshotStore.default_years()
+
+        existing = SnapshotStore.load(asset_name)
+        if existing and existing.get("report_date") == report_date and existing.get("end_year") == end_year and "weekly_logs" in existing:
+            existing["checked_at"] = now
+            SnapshotStore._write(asset_name, existing)
+            return existing
+
+        sel_start, sel_end = default_analysis_range(combined_df)
+        analysis_result = MarketAnalyzer.analyze(combined_df, start=sel_start, end=sel_end)
+        if not analysis_result.get('is_valid'):
+            return None
+
+        fig = charts.plot_market_overview(
+            combined_df, price_df, asset_conf,
+            show_dollar_value=DEFAULT_CHART_OPTIONS["show_dollar"],
+            highlight_change=DEFAULT_CHART_OPTIONS["highlight"],
+            analysis_range=(sel_start, sel_end)
+        )
+
+        analysis_df = analysis_result['analysis_df']
+        snapshot = {
+            "asset": asset_name,
+            "report_date": report_date,
+            "start_year": start_year,
+            "end_year": end_year,
+            "min_date": combined_df.index[0].strftime('%Y-%m-%d'),
+            "max_date": report_date,
+            "default_range": [sel_start.isoformat(), sel_end.isoformat()],
+            "analysis": {k: analysis_result[k] for k in ("is_valid", "metrics", "trend", "verdict", "positioning")},
+            "weekly_logs": analysis_result['weekly_logs'].to_columns(),
+            "analysis_df": analysis_df.assign(Date=analysis_df['Date'].dt.strftime('%Y-%m-%d')).to_dict(orient="split"),
+            "chart_json": fig.to_json(),
+            "created_at": now,
+            "checked_at": now,
+        }
+        SnapshotStore._write(asset_name, snapshot)
+        return snapshot
+
+    @staticmethod
+    def analysis_df(snapshot):
+        """Rebuilds the weekly analysis frame (same values/order as MarketAnalyzer's)."""
+        df = pd.DataFrame(**snapshot["analysis_df"])
+        df['Date'] = pd.to_datetime(df['Date'])
+        return df
+
+    @staticmethod
+    def analysis_result(snapshot):
+        """The stored analysis in MarketAnalyzer.analyze's result shape."""
+        return dict(
+            snapshot["analysis"],
+            weekly_logs=WeeklyLogs.from_columns(snapshot["weekly_logs"]),
+            analysis_df=SnapshotStore.analysis_df(snapshot),
+        )
+
+    @staticmethod
+    def _write(asset_name, snapshot):
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        path = SnapshotStore._path(asset_name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False, default=lambda o: o.item() if hasattr(o, "item") else str(o))
+        os.replace(tmp_path, path)
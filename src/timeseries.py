@@ -0,0 +1,46 @@
+import datetime
+import pandas as pd
+from src.config import DEFAULT_ANALYSIS_WEEKS
+
+
+def index_by_date(df, date_col='Date'):
+    """
+    Returns the frame sorted by `date_col` with a DatetimeIndex on it (the column is kept),
+    so later range lookups can binary-search instead of scanning every row.
+    """
+    df = df.sort_values(date_col)
+    df.index = pd.DatetimeIndex(df[date_col].to_numpy())
+    return df
+
+
+def select_range(df, start=None, end=None, date_col='Date'):
+    """
+    Selects rows with start <= date <= end (both inclusive, compared by calendar day).
+    Uses searchsorted on the sorted DatetimeIndex -> O(log n), and returns an iloc
+    slice instead of a boolean-mask copy.
+    """
+    if isinstance(df.index, pd.DatetimeIndex) and df.index.is_monotonic_increasing:
+        index = df.index
+    else:
+        df = index_by_date(df, date_col)
+        index = df.index
+
+    lo = 0 if start is None else index.searchsorted(pd.Timestamp(start).normalize(), side='left')
+    hi = len(index) if end is None else index.searchsorted(pd.Timestamp(end).normalize() + pd.Timedelta(days=1), side='left')
+    return df.iloc[lo:hi]
+
+
+def default_analysis_range(df, weeks=DEFAULT_ANALYSIS_WEEKS):
+    """Default time-machine window: the last `weeks` weeks up to the latest report (dates)."""
+    max_date = df.index[-1].date()
+    return max_date - datetime.timedelta(weeks=weeks), max_date
+
+
+# CFTC publishes Tuesday's positions on Friday 15:30 ET (~20:30 UTC; 21:00 UTC covers DST)
+RELEASE_LAG = datetime.timedelta(days=3, hours=21)
+
+
+def next_release_due(report_date):
+    """UTC time the report after `report_date` (a Tuesday, date or 'YYYY-MM-DD') should be out."""
+    report_day = pd.Timestamp(report_date).normalize().to_pydatetime().replace(tzinfo=datetime.timezone.utc)
+    return report_day + datetime.timedelta(weeks=1) + RELEASE_LAG
@@ -2,12 +2,97 @@
 import plotly.graph_objs as go
 from plotly.subplots import make_subplots
 import pandas as pd
+import numpy as np
+from src import perf
 
-def plot_market_overview(combined_df, price_df, asset_conf, show_dollar_value=False, highlight_change=True, analysis_range=None):
+# 일봉 가격 트레이스의 최대 포인트 수 (브라우저 전송량 제한)
+MAX_PRICE_POINTS = 600
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+    Returns the positional indices of the points to keep (first/last always kept),
+    so peaks and troughs survive while the point count is capped at `threshold`.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # Bucket edges for the n-2 inner points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average point of the next bucket (last bucket -> last point)
+        if i + 2 < len(edges):
+            nlo, nhi = edges[i + 1], edges[i + 2]
+        else:
+            nlo, nhi = n - 1, n
+        avg_x = x[nlo:nhi].mean()
+        avg_y = y[nlo:nhi].mean()
+
+        # Triangle area between the last kept point, candidates and the next bucket average
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return selected
+
+
+def downsample_series(series, max_points=MAX_PRICE_POINTS, keep_range=None):
+    """
+    Caps a DatetimeIndex-ed series to roughly `max_points` points with LTTB.
+    Points inside `keep_range` (start, end) stay at full resolution, so zooming into
+    a window (narrower years or the analysis range) brings back every daily point.
+    """
+    series = series.dropna()
+    if len(series) <= max_points:
+        return series
+
+    index = series.index
+    inside = np.zeros(len(series), dtype=bool)
+    if keep_range:
+        start = pd.Timestamp(keep_range[0])
+        end = pd.Timestamp(keep_range[1]) + pd.Timedelta(days=1)
+        inside[index.searchsorted(start):index.searchsorted(end)] = True
+
+    n_inside = int(inside.sum())
+    budget = max(max_points - n_inside, 3)
+    outside_positions = np.flatnonzero(~inside)
+    if len(outside_positions) <= budget:
+        return series
+
+    # Downsample each contiguous outside segment proportionally to its length
+    keep = [np.flatnonzero(inside)]
+    segments = np.split(outside_positions, np.flatnonzero(np.diff(outside_positions) != 1) + 1)
+    x_num = index.asi8
+    values = series.to_numpy()
+    for seg in segments:
+        seg_budget = max(int(round(budget * len(seg) / len(outside_positions))), 3)
+        picked = lttb_indices(x_num[seg], values[seg], seg_budget)
+        keep.append(seg[picked])
+
+    positions = np.unique(np.concatenate(keep))
+    return series.iloc[positions]
+
+
+@perf.timed("charts.plot_market_overview")
+def plot_market_overview(combined_df, price_df, asset_conf, show_dollar_value=False, highlight_change=True, analysis_range=None, max_price_points=MAX_PRICE_POINTS):
     """
     Generates the dual-axis chart for Price vs Short OI.
     combined_df: Weekly merged data (CFTC + Price at that time).
     price_df: Daily price data (for smooth price line).
+    max_price_points: Cap for the daily price trace (LTTB); None disables downsampling.
     """
     
     # Value Calculation ($ or Contracts)
@@ -19,8 +104,9 @@ def plot_market_overview(combined_df, price_df, asset_conf, show_dollar_value=Fa
     x_cftc = combined_df['Date']
     
     if show_dollar_value:
-        y_hf = hf_shorts_raw * btc_price_raw * multiplier
-        y_am = asset_mgr_shorts_raw * btc_price_raw * multiplier
+        # Precomputed by Positioning in the data bundle when available
+        y_hf = combined_df['Lev_Money_Short_USD'] if 'Lev_Money_Short_USD' in combined_df.columns else hf_shorts_raw * btc_price_raw * multiplier
+        y_am = combined_df['Asset_Mgr_Short_USD'] if 'Asset_Mgr_Short_USD' in combined_df.columns else asset_mgr_shorts_raw * btc_price_raw * multiplier
         y_axis_title = "Short Interest (USD Value)"
     else:
         y_hf = hf_shorts_raw
@@ -46,12 +132,16 @@ def plot_market_overview(combined_df, price_df, asset_conf, show_dollar_value=Fa
     # --- DRAW CHART ---
     fig = make_subplots(specs=[[{"secondary_y": True}]])
     
-    ticker_name = asset_conf['ticker'].split("-")[0] # BTC or ETH
+    ticker_name = asset_conf.get('symbol', asset_conf['ticker'].split("-")[0]) # BTC, ETH, ES ...
 
     # 1. Price (Left - Asset Color) - Use Daily Data
     # price_df index is Date
-    x_btc = price_df.index
-    y_btc = price_df['Close']
+    # Long ranges are downsampled (LTTB) outside the analysis window to keep the figure light
+    price_series = price_df['Close']
+    if max_price_points:
+        price_series = downsample_series(price_series, max_price_points, keep_range=analysis_range)
+    x_btc = price_series.index
+    y_btc = price_series
     
     fig.add_trace(
         go.Scatter(x=x_btc, y=y_btc, name=f"{ticker_name} Price", line=dict(color=asset_conf['color'], width=2)),
@@ -85,12 +175,54 @@ def plot_market_overview(combined_df, price_df, asset_conf, show_dollar_value=Fa
 
     # Analysis Range Highlight
     if analysis_range:
-        sel_start_date, sel_end_date = analysis_range
-        fig.add_vrect(
-            x0=sel_start_date, x1=sel_end_date,
-            fillcolor="green", opacity=0.1,
-            layer="below", line_width=0,
-            annotation_text="분석 구간", annotation_position="top left"
-        )
+        add_analysis_band(fig, analysis_range)
+
+    return fig
+
+
+def add_analysis_band(fig, analysis_range):
+    """Draws the green '분석 구간' band for the selected (start, end) range."""
+    sel_start_date, sel_end_date = analysis_range
+    fig.add_vrect(
+        x0=sel_start_date, x1=sel_end_date,
+        fillcolor="green", opacity=0.1,
+        layer="below", line_width=0,
+        annotation_text="분석 구간", annotation_position="top left"
+    )
+    return fig
+
 
+@perf.timed("charts.with_analysis_range")
+def with_analysis_range(base_fig, price_df, analysis_range, max_price_points=MAX_PRICE_POINTS):
+    """
+    Returns a copy of a base overview figure (built with analysis_range=None) for a new
+    slider position: only the price trace is re-sampled and the band is drawn.
+    The CFTC traces and layout are reused, so slider moves skip the full rebuild.
+    """
+    fig = go.Figure(base_fig)
+    if max_price_points:
+        price_series = downsample_series(price_df['Close'], max_price_points, keep_range=analysis_range)
+        fig.data[0].update(x=price_series.index, y=price_series)
+    return add_analysis_band(fig, analysis_range)
+
+
+def plot_correlation_heatmap(matrix, row_labels, col_labels, title):
+    """Correlation matrix heatmap (-1 blue ~ +1 red) with values printed in the cells."""
+    fig = go.Figure(go.Heatmap(
+        z=matrix, x=col_labels, y=row_labels,
+        zmin=-1, zmax=1, colorscale="RdBu_r",
+        text=np.round(matrix, 2), texttemplate="%{text}",
+        hovertemplate="%{y} / %{x}: %{z:.2f}<extra></extra>"
+    ))
+    fig.update_layout(title_text=title, height=120 + 45 * len(row_labels), yaxis=dict(autorange="reversed"))
+    return fig
+
+
+def plot_average_correlation(dates, values, window):
+    """Mean pairwise correlation per rolling window (how much the markets move together over time)."""
+    fig = go.Figure(go.Scatter(x=dates, y=values, name="Mean pairwise correlation", line=dict(color="teal", width=2)))
+    fig.update_layout(
+        title_text=f"평균 상관계수 추이 (Rolling {window}w)",
+        height=300, yaxis=dict(range=[-1, 1]), hovermode="x unified"
+    )
     return fig
@@ -101,3 +101,52 @@ def render_ai_cards(phases):
     """
     
     components.html(full_html, height=450)
+
+
+def render_ai_narrative(ai_result):
+    """
+    Renders a complete (parsed) narrative result: summary, phase cards, future plan and advice.
+    """
+    if "error" in ai_result:
+        st.error(f"AI Error: {ai_result['error']}")
+        return
+
+    # Render Cards
+    st.success(f"**전략 요약**: {ai_result.get('header', '')}")
+    render_ai_cards(ai_result.get('phases', []))
+    
+    st.markdown("---")
+    st.markdown(f"**🔮 미래 계획**: {ai_result.get('future')}")
+    st.markdown(f"**💡 조언**: {ai_result.get('advice')}")
+
+
+def render_ai_narrative_stream(events):
+    """
+    Renders narrative events from AINarrator.stream_narrative progressively:
+    the header and each completed phase card appear as soon as they arrive.
+    Returns the final parsed result (or {"error": ...}).
+    """
+    header_slot = st.empty()
+    cards_slot = st.empty()
+    footer_slot = st.container()
+    phases = []
+
+    for event, payload in events:
+        if event == "header":
+            header_slot.success(f"**전략 요약**: {payload}")
+        elif event == "phase":
+            phases.append(payload)
+            with cards_slot.container():
+                render_ai_cards(phases)
+        elif event == "future":
+            footer_slot.markdown("---")
+            footer_slot.markdown(f"**🔮 미래 계획**: {payload}")
+        elif event == "advice":
+            footer_slot.markdown(f"**💡 조언**: {payload}")
+        elif event == "error":
+            st.error(f"AI Error: {payload}")
+            return {"error": payload}
+        elif event == "done":
+            return payload
+
+    return {"error": "Empty response."}
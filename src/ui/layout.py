@@ -1,7 +1,7 @@
 
 import streamlit as st
 import datetime
-from src.config import ASSET_CONFIG
+from src.config import ASSET_CONFIG, DEFAULT_START_YEAR, PANEL_DEFAULT_WINDOW, PANEL_DEFAULT_MAX_LAG
 
 def render_page_config():
     st.set_page_config(page_title="CFTC Hedge Fund Analysis", layout="wide")
@@ -16,7 +16,7 @@ def render_sidebar():
     st.sidebar.header("Data Configuration")
 
     # Navigation
-    page = st.sidebar.radio("이동하실 페이지를 선택하세요:", ["📊 차트 분석 (Analysis)", "🎓 초보자 가이드 (Guide)"])
+    page = st.sidebar.radio("이동하실 페이지를 선택하세요:", ["📊 차트 분석 (Analysis)", "🧭 크로스 마켓 (Cross-Asset)", "🎓 초보자 가이드 (Guide)"])
     st.sidebar.markdown("---")
     
     settings = {
@@ -26,19 +26,23 @@ def render_sidebar():
         "end_year": None,
         "show_dollar": False,
         "highlight": False,
-        "api_key": None
+        "api_key": None,
+        "show_perf": False,
+        "panel_assets": [],
+        "panel_window": PANEL_DEFAULT_WINDOW,
+        "panel_max_lag": PANEL_DEFAULT_MAX_LAG
     }
 
     if page == "📊 차트 분석 (Analysis)":
         st.sidebar.header("설정 (Settings)")
         
         # Asset
-        selected_asset_name = st.sidebar.selectbox("분석 대상 코인", list(ASSET_CONFIG.keys()))
+        selected_asset_name = st.sidebar.selectbox("분석 대상 마켓", list(ASSET_CONFIG.keys()))
         settings["asset_name"] = selected_asset_name
         
         # Date
         current_year = datetime.datetime.now().year
-        start_year = st.sidebar.number_input("시작 연도", min_value=2018, max_value=current_year, value=2023)
+        start_year = st.sidebar.number_input("시작 연도", min_value=2018, max_value=current_year, value=DEFAULT_START_YEAR)
         end_year = st.sidebar.number_input("종료 연도", min_value=2018, max_value=current_year, value=current_year)
         settings["start_year"] = start_year
         settings["end_year"] = end_year
@@ -53,4 +57,56 @@ def render_sidebar():
         st.sidebar.markdown("### 🔑 AI 실험실 (Lab)")
         settings["api_key"] = st.sidebar.text_input("Gemini API Key", type="password", help="[헤지펀드의 고백] 기능을 사용하려면 API 키가 필요합니다.")
 
+    elif page == "🧭 크로스 마켓 (Cross-Asset)":
+        st.sidebar.header("설정 (Settings)")
+        
+        asset_names = list(ASSET_CONFIG.keys())
+        settings["panel_assets"] = st.sidebar.multiselect("비교할 마켓", asset_names, default=asset_names[:6])
+        
+        current_year = datetime.datetime.now().year
+        settings["start_year"] = st.sidebar.number_input("시작 연도", min_value=2018, max_value=current_year, value=DEFAULT_START_YEAR)
+        settings["end_year"] = st.sidebar.number_input("종료 연도", min_value=2018, max_value=current_year, value=current_year)
+        
+        settings["panel_window"] = st.sidebar.slider("롤링 상관 윈도우 (주)", min_value=8, max_value=104, value=PANEL_DEFAULT_WINDOW)
+        settings["panel_max_lag"] = st.sidebar.slider("선행/후행 최대 시차 (주)", min_value=1, max_value=12, value=PANEL_DEFAULT_MAX_LAG)
+
+    st.sidebar.markdown("---")
+    settings["show_perf"] = st.sidebar.checkbox("⏱ 성능 패널 (Performance)", value=False, help="직전 실행의 단계별 소요 시간을 표시합니다.")
+
     return settings
+
+
+def render_data_status(report_date, price_date=None, loaded_at=None, refreshing=False):
+    """
+    Sidebar caption with the as-of dates of the data on screen (cached data may be served
+    while a newer copy is being fetched in the background).
+    """
+    text = f"📅 데이터 기준: CFTC 리포트 {report_date}"
+    if price_date:
+        text += f" · 가격 {price_date}"
+    if loaded_at:
+        text += f"  \n불러온 시각 {loaded_at:%Y-%m-%d %H:%M}"
+    if refreshing:
+        text += " (최신 데이터 확인 중…)"
+    st.sidebar.caption(text)
+
+
+def render_perf_panel(records):
+    """
+    Sidebar panel listing the per-stage timings (perf spans) of the last rerun.
+    """
+    st.sidebar.markdown("### ⏱ 성능 (Last Rerun)")
+    if not records:
+        st.sidebar.caption("기록된 구간이 없습니다.")
+        return
+
+    rows = []
+    for r in records:
+        extra = {k: v for k, v in r.items() if k not in ("span", "ms", "cache")}
+        rows.append({
+            "stage": r["span"],
+            "ms": r["ms"],
+            "cache": r.get("cache", ""),
+            "detail": ", ".join(f"{k}={v}" for k, v in extra.items())
+        })
+    st.sidebar.dataframe(rows, hide_index=True, use_container_width=True)
@@ -0,0 +1,111 @@
+"""
+Weekly signal watcher: alerts when a new CFTC report flags a pattern (🩸 Bear Raid, 💥 Squeeze, ...).
+
+Each run:
+  1. Release calendar: before the next report is due (Friday ~21:00 UTC after the
+     last seen Tuesday), exits without any network request.
+  2. Conditional check: HEAD on the current-year zip (and last year's while the last seen
+     report is from last year); unchanged ETag/Last-Modified -> exit.
+  3. Otherwise reads the new file once and classifies only the weeks after each asset's
+     last seen week (src/analysis/signal_watcher.py), then sends non-neutral signals to
+     the alert sinks (ALERT_SINKS / --sinks: file, webhook, stdout, memory).
+
+Usage (cron, or --loop for a long-running process):
+    python watch_signals.py [--sinks "file:alerts.jsonl,webhook:https://..."] [--force] [--loop 900]
+"""
+import os
+import json
+import time
+import argparse
+import datetime
+
+from src.config import ASSET_CONFIG, ALERT_SINKS, WATCHER_STATE_FILE
+from src.data_loader import DataLoader
+from src.timeseries import next_release_due
+from src.analysis.signal_watcher import SignalWatcher
+from src.alerts import create_sinks, dispatch
+
+
+def read_state():
+    try:
+        with open(WATCHER_STATE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_state(state):
+    os.makedirs(os.path.dirname(WATCHER_STATE_FILE) or ".", exist_ok=True)
+    tmp_path = f"{WATCHER_STATE_FILE}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, WATCHER_STATE_FILE)
+
+
+def check_once(sinks, force=False, assets=None):
+    """One watcher pass. Returns the list of dispatched alerts."""
+    state = read_state()
+    now = datetime.datetime.now(datetime.timezone.utc)
+    year = now.year
+
+    # 1. Release calendar (no network)
+    report_date = state.get("report_date")
+    if report_date and not force and now < next_release_due(report_date):
+        print(f"Next report due {next_release_due(report_date):%Y-%m-%d %H:%M} UTC (last: {report_date}).")
+        return []
+
+    # 2. Conditional check on the current-year file. Until a report of this year has been seen,
+    # last year's file is checked too: the late-December report is published in January.
+    years = [year] if report_date and int(report_date[:4]) >= year else [year - 1, year]
+    remote = {str(y): DataLoader.remote_year_version(y) for y in years}
+    if all(remote.values()) and remote == state.get("remote") and not force:
+        print(f"No change in the {'/'.join(remote)} file(s) since {state.get('checked_at')}.")
+        state["checked_at"] = now.isoformat(timespec="seconds")
+        write_state(state)
+        return []
+
+    # 3. New file -> evaluate only the new weeks per asset
+    for y in years:
+        DataLoader.invalidate_year(y, revalidate=True)
+    asset_state = state.setdefault("assets", {})
+    alerts = []
+    for name, conf in ASSET_CONFIG.items():
+        if assets and name not in assets and conf.get('symbol') not in assets:
+            continue
+        signals, last_seen = SignalWatcher.evaluate(name, conf, asset_state.get(name), year)
+        if last_seen:
+            asset_state[name] = last_seen
+        alerts += [s for s in signals if s["signal"] != "NEUTRAL"]
+
+    latest = max(filter(None, (DataLoader.latest_report_date(y) for y in years)), default=None)
+    if latest:
+        state["report_date"] = latest
+    if all(remote.values()):
+        state["remote"] = remote
+    state["checked_at"] = now.isoformat(timespec="seconds")
+
+    failures = dispatch(alerts, sinks)
+    print(f"Report {state.get('report_date')}: {len(alerts)} alert(s), {len(failures)} delivery failure(s).")
+    # Keep the state even if a sink failed (no duplicate alerts to the sinks that worked)
+    write_state(state)
+    return alerts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sinks", default=ALERT_SINKS, help="comma-separated: file:<path>, webhook:<url>, stdout, memory")
+    parser.add_argument("--assets", nargs="*", help="asset names or symbols (default: all)")
+    parser.add_argument("--force", action="store_true", help="skip the release calendar / unchanged-file checks")
+    parser.add_argument("--loop", type=int, default=0, metavar="SECONDS", help="keep running, checking every SECONDS")
+    args = parser.parse_args()
+
+    sinks = create_sinks(args.sinks)
+    check_once(sinks, force=args.force, assets=args.assets)
+    while args.loop:
+        time.sleep(args.loop)
+        check_once(sinks, assets=args.assets)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())